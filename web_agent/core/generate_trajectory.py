@@ -510,7 +510,7 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                             print(f"   Previous tab count: {previous_tab_count}")
                             print(f"   Previous tab URLs: {list(previous_tab_urls)[:3]}...")  # Show first 3 URLs
                             
-                            has_new_tabs, new_tabs, current_tab_count = check_for_new_tabs(
+                            has_new_tabs, new_tabs, current_tab_count, current_tab_urls = check_for_new_tabs(
                                 browser, previous_tab_count, previous_tab_urls
                             )
                             
@@ -531,7 +531,7 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                                 #     # Update our page reference and tracking variables
                                 #     page = new_page
                                 #     previous_tab_count = current_tab_count
-                                #     previous_tab_urls = {tab['url'] for tab in get_all_open_tabs(browser)}
+                                #     previous_tab_urls = current_tab_urls
                                 #     
                                 #     # Update the URL variable so GPT gets the correct context
                                 #     url = page.url
@@ -547,7 +547,7 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                                 #     print("⚠️  Failed to switch to new tab, continuing with current page")
                                 #     # Update tracking even if switch failed
                                 #     previous_tab_count = current_tab_count
-                                #     previous_tab_urls = {tab['url'] for tab in get_all_open_tabs(browser)}
+                                #     previous_tab_urls = current_tab_urls
                                 
                                 # NEW CODE - End trajectory when new tabs detected
                                 print(f"🆕 New tabs detected! Ending trajectory as requested...")
@@ -619,7 +619,7 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                                     print(f"   Previous tab count: {previous_tab_count}")
                                     print(f"   Previous tab URLs: {list(previous_tab_urls)[:3]}...")  # Show first 3 URLs
                                     
-                                    has_new_tabs, new_tabs, current_tab_count = check_for_new_tabs(
+                                    has_new_tabs, new_tabs, current_tab_count, current_tab_urls = check_for_new_tabs(
                                         browser, previous_tab_count, previous_tab_urls
                                     )
                                     
@@ -640,7 +640,7 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                                         #     # Update our page reference and tracking variables
                                         #     page = new_page
                                         #     previous_tab_count = current_tab_count
-                                        #     previous_tab_urls = {tab['url'] for tab in get_all_open_tabs(browser)}
+                                        #     previous_tab_urls = current_tab_urls
                                         #     
                                         #     # Update the URL variable so GPT gets the correct context
                                         #     url = page.url
@@ -656,7 +656,7 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                                         #     print("⚠️  Failed to switch to new tab, continuing with current page")
                                         #     # Update tracking even if switch failed
                                         #     previous_tab_count = current_tab_count
-                                        #     previous_tab_urls = {tab['url'] for tab in get_all_open_tabs(browser)}
+                                        #     previous_tab_urls = current_tab_urls
                                         
                                         # NEW CODE - End trajectory when new tabs detected
                                         print(f"🆕 New tabs detected! Ending trajectory as requested...")
@@ -424,10 +424,20 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import json
-import base64
-from typing import Dict, List
+import errno
+import hashlib
+import logging
+import shutil
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional
+import httpx
 from openai import OpenAI
-from config import RESULTS_DIR
+import orjson
+import pybase64
+from config import RESULTS_DIR, VERBOSE_OUTPUT
+from utils.trajectory_file_utils import atomic_write_bytes
 from PIL import Image
 from io import BytesIO
 
@@ -435,26 +445,83 @@ from io import BytesIO
 import os
 import dotenv
 dotenv.load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Retries for rate-limited (429), 5xx and connection failures; the SDK backs off
+# exponentially and honors Retry-After, so transient errors do not become status 0
+VERIFY_MAX_RETRIES = int(os.getenv("VERIFY_MAX_RETRIES", "6"))
+
+# Shared HTTP/2 connection pool so verifications reuse connections
+client = OpenAI(
+    api_key=os.getenv("OPENAI_API_KEY"),
+    max_retries=VERIFY_MAX_RETRIES,
+    http_client=httpx.Client(
+        http2=True,
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=64),
+        timeout=60
+    )
+)
+
+# Per-trajectory organization output; enabled by organize_trajectories(verbose=True).
+# Handlers are left to the entry point.
+logger = logging.getLogger(__name__)
 
 # Maximum number of trajectories to verify (set to None for all)
 MAX_TRAJECTORIES = 1000
 
+# Number of trajectories verified concurrently; raise it only if the API rate limit allows
+MAX_WORKERS = int(os.getenv("VERIFY_MAX_WORKERS", "4"))
+
+# Number of trajectory folders moved concurrently when organizing
+MAX_MOVE_WORKERS = 8
+
+# Screenshots are sent with detail "low", which never looks past 512x512
+MAX_IMAGE_WIDTH = 384
+
+# Children of RESULTS_DIR are built from this prefix rather than os.path.join
+_RESULTS_DIR_PREFIX = RESULTS_DIR.rstrip(os.sep) + os.sep
+
+# Folders trajectories are moved into, by verification status
+STATUS_FOLDERS = {
+    0: f"{_RESULTS_DIR_PREFIX}status_0_error",
+    1: f"{_RESULTS_DIR_PREFIX}status_1_perfect",
+    2: f"{_RESULTS_DIR_PREFIX}status_2_inefficient",
+    3: f"{_RESULTS_DIR_PREFIX}status_3_wrong_output",
+    4: f"{_RESULTS_DIR_PREFIX}status_4_complete_failure"
+}
+
+# Cache of verification results keyed by a hash of the verification inputs
+VERIFICATION_CACHE_PATH = f"{_RESULTS_DIR_PREFIX}cache.json"
+_CACHE_LOCK = threading.Lock()
+
+# New verdicts collected before the cache is written out again (it is also written at the end)
+CACHE_SAVE_INTERVAL = 25
+
+# Append-only log of results, written as each trajectory is verified so runs can resume
+VERIFICATION_LOG_PATH = f"{_RESULTS_DIR_PREFIX}verification_results.jsonl"
+
+# Token usage aggregated across all API calls of a run
+TOKEN_COUNTS = Counter()
+_TOKEN_LOCK = threading.Lock()
+
 def log_token_usage(resp):
-    """Prints a detailed breakdown of token usage from OpenAI response."""
+    """Adds token usage from an OpenAI response to TOKEN_COUNTS and returns the total."""
     if hasattr(resp, "usage"):
-        input_tokens = getattr(resp.usage, "prompt_tokens", None)
-        output_tokens = getattr(resp.usage, "completion_tokens", None)
-        total_tokens = getattr(resp.usage, "total_tokens", None)
-        print("\n📊 Token Usage Report:")
-        print(f"📝 Input (Prompt) tokens: {input_tokens}")
-        print(f"💬 Output (Completion) tokens: {output_tokens}")
-        print(f"🔢 Total tokens charged: {total_tokens}")
+        input_tokens = getattr(resp.usage, "prompt_tokens", None) or 0
+        output_tokens = getattr(resp.usage, "completion_tokens", None) or 0
+        total_tokens = getattr(resp.usage, "total_tokens", None) or 0
+        with _TOKEN_LOCK:
+            TOKEN_COUNTS.update({'prompt': input_tokens, 'completion': output_tokens, 'total': total_tokens})
         return total_tokens
     else:
         print("⚠️ Token usage info not available from API response.")
         return 0
 
+def print_token_usage_report():
+    """Prints the token usage aggregated in TOKEN_COUNTS."""
+    print("\n📊 Token Usage Report:")
+    print(f"📝 Input (Prompt) tokens: {TOKEN_COUNTS['prompt']}")
+    print(f"💬 Output (Completion) tokens: {TOKEN_COUNTS['completion']}")
+    print(f"🔢 Total tokens charged: {TOKEN_COUNTS['total']}")
+
 def load_trajectory(trajectory_path: str) -> Dict:
     """Load trajectory.json file."""
     with open(trajectory_path, 'r', encoding='utf-8') as f:
@@ -465,17 +532,110 @@ def load_metadata(metadata_path: str) -> Dict:
     with open(metadata_path, 'r', encoding='utf-8') as f:
         return json.load(f)
 
+def load_verification_cache() -> Dict:
+    """Load the verification cache, or an empty cache if none exists."""
+    if not os.path.exists(VERIFICATION_CACHE_PATH):
+        return {}
+    try:
+        with open(VERIFICATION_CACHE_PATH, 'rb') as f:
+            return orjson.loads(f.read())
+    except (orjson.JSONDecodeError, OSError) as e:
+        print(f"⚠️ Could not read verification cache, starting fresh: {str(e)}")
+        return {}
+
+def save_verification_cache(cache: Dict):
+    """Atomically write the verification cache to disk."""
+    # Serialize under the lock so worker threads can keep adding verdicts meanwhile
+    with _CACHE_LOCK:
+        payload = orjson.dumps(cache)
+    atomic_write_bytes(VERIFICATION_CACHE_PATH, payload)
+
+def verification_cache_key(task: str, last_step_screenshot: str, final_screenshot: str, executed_codes: List[str]) -> str:
+    """Hash the inputs of a verification so unchanged trajectories can reuse their result."""
+    mtimes = (os.path.getmtime(last_step_screenshot), os.path.getmtime(final_screenshot))
+    return hashlib.blake2b(repr((task, mtimes, executed_codes)).encode(), digest_size=16).hexdigest()
+
+def load_latest_verification_results() -> Dict[str, Dict]:
+    """Return the last logged result for each trajectory; re-runs can log a trajectory more than once."""
+    latest = {}
+    for entry in iter_verification_log():
+        latest[entry['trajectory']] = entry
+    return latest
+
+def iter_verification_log() -> Iterator[Dict]:
+    """Stream the results recorded in the verification log, one entry per line."""
+    if not os.path.exists(VERIFICATION_LOG_PATH):
+        return
+    with open(VERIFICATION_LOG_PATH, 'rb') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield orjson.loads(line)
+            except orjson.JSONDecodeError:
+                # A crash can leave a partially written last line
+                continue
+
+def heuristic_prescreen(trajectory: Dict, metadata: Dict) -> Optional[Dict]:
+    """Assign a status without calling GPT when the outcome is obvious.
+
+    Returns status 0 for malformed metadata, status 4 when the trajectory has
+    no executed steps, and None when the trajectory needs a real verification
+    or its format is not recognized.
+    """
+    task = metadata.get('task')
+    instruction = task.get('instruction') if isinstance(task, dict) else None
+    if not isinstance(instruction, dict) or not instruction.get('low_level') or not instruction.get('high_level'):
+        return {
+            'status': 0,
+            'analysis': 'Malformed metadata - missing task instruction',
+            'tokens_used': 0
+        }
+    
+    if not trajectory or not isinstance(trajectory, dict):
+        # Empty trajectories are reported by verify_trajectory
+        return None
+    
+    if isinstance(trajectory.get('steps'), list):
+        # OCR trajectories keep their steps in a list
+        executed = bool(trajectory['steps'])
+    elif all(isinstance(step, dict) and isinstance(step.get('action'), dict) for step in trajectory.values()):
+        # Numbered steps, each with the Playwright code it ran
+        executed = any(step['action'].get('playwright_code') for step in trajectory.values())
+    else:
+        # Unknown format; leave it to the full verification
+        return None
+    
+    if not executed:
+        return {
+            'status': 4,
+            'analysis': 'No actions were executed',
+            'tokens_used': 0
+        }
+    
+    return None
+
+def get_high_level_task(metadata: Dict) -> str:
+    """Return the high level instruction from metadata, or an empty string if missing."""
+    try:
+        return metadata['task']['instruction']['high_level']
+    except (KeyError, TypeError):
+        return ''
+
 def process_image(image_path: str) -> str:
     """Process and encode image for GPT."""
     with Image.open(image_path) as img:
-        if img.width > 512:
+        # Let libjpeg downscale during decode; the resize below shrinks it further anyway
+        if img.format == "JPEG":
+            img.draft("RGB", (1024, 1024))
+        if img.width > MAX_IMAGE_WIDTH:
             aspect_ratio = img.height / img.width
-            new_height = int(512 * aspect_ratio)
-            img = img.resize((512, new_height), Image.LANCZOS)
+            new_height = int(MAX_IMAGE_WIDTH * aspect_ratio)
+            img = img.resize((MAX_IMAGE_WIDTH, new_height), Image.LANCZOS)
         
         buffer = BytesIO()
         img.save(buffer, format="PNG", optimize=True)
-        return base64.b64encode(buffer.getvalue()).decode("utf-8")
+        return pybase64.b64encode(buffer.getvalue()).decode("ascii")
 
 def verify_task_completion(
     task: str,
@@ -509,14 +669,13 @@ def verify_task_completion(
                       4 = Complete failure: both output and steps are wrong
                     - analysis: string explaining the status (required for status 2,3,4)
 
-                    Example responses (you must return EXACTLY one of these formats):
+                    Example responses:
                     {"status": 1}
                     {"status": 2, "analysis": "Task completed correctly but had unnecessary steps 2-3 before finding the right approach in step 4"}
                     {"status": 3, "analysis": "The meeting was created at the wrong time (2:00 PM instead of 3:00 PM) but the steps to create it were correct"}
                     {"status": 4, "analysis": "Failed to create the meeting - wrong approach and wrong time"}
 
                     IMPORTANT: 
-                    - Your entire response must be a single valid JSON object. Do not include any other text or explanation outside the JSON.
                     - Be flexible for details that are not explicitly stated in the task, as the agent was given flexibility to assume details if not given.
                     - Ex: If the task doesn't specify the specific hours, only that the event was for the full day tomorrow, it's ok if the task was assigned to a particular time as long as the date is right.
                     """
@@ -536,20 +695,23 @@ Please analyze if the task was completed successfully."""
                         {
                             "type": "image_url",
                             "image_url": {
-                                "url": f"data:image/png;base64,{last_step_image}"
+                                "url": f"data:image/png;base64,{last_step_image}",
+                                "detail": "low"
                             }
                         },
                         {
                             "type": "image_url",
                             "image_url": {
-                                "url": f"data:image/png;base64,{final_image}"
+                                "url": f"data:image/png;base64,{final_image}",
+                                "detail": "low"
                             }
                         }
                     ]
                 }
             ],
-            temperature=0.7,
-            max_tokens=500
+            temperature=0,
+            max_tokens=200,
+            response_format={"type": "json_object"}
         )
 
         # Log token usage
@@ -557,13 +719,13 @@ Please analyze if the task was completed successfully."""
 
         # Parse the response as JSON
         try:
-            result = json.loads(response.choices[0].message.content)
+            result = orjson.loads(response.choices[0].message.content)
             return {
                 "status": result.get("status", 0),
-                "analysis": result.get("analysis", "") if result.get("status", 0) in [2, 3, 4] else "",
+                "analysis": result.get("analysis", "") if result.get("status", 0) in (2, 3, 4) else "",
                 "tokens_used": tokens_used
             }
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             print("Error: GPT response was not valid JSON")
             return {
                 "status": 0,
@@ -579,233 +741,363 @@ Please analyze if the task was completed successfully."""
             "tokens_used": 0
         }
 
-def verify_all_trajectories():
-    """Main function to verify all trajectories in the results directory."""
-    results = []
-    total_tokens = 0
+def verify_trajectory(calendar_dir: str, cache: Dict) -> Optional[Dict]:
+    """Verify a single trajectory directory and return its result entry.
+
+    Returns None if the directory is not a trajectory or could not be processed.
+    """
+    dir_path = f"{_RESULTS_DIR_PREFIX}{calendar_dir}"
+    trajectory_path = f"{dir_path}{os.sep}trajectory.json"
+    metadata_path = f"{dir_path}{os.sep}metadata.json"
     
-    # Get all calendar directoriesx
-    calendar_dirs = [d for d in os.listdir(RESULTS_DIR) if os.path.isdir(os.path.join(RESULTS_DIR, d))]
+    # One directory read instead of a stat per expected file
+    try:
+        with os.scandir(dir_path) as it:
+            names = {entry.name for entry in it}
+    except OSError:
+        return None
     
-    # Limit number of trajectories if MAX_TRAJECTORIES is set
-    if MAX_TRAJECTORIES is not None:
-        calendar_dirs = calendar_dirs[:MAX_TRAJECTORIES]
-        print(f"\n🔍 Verifying {len(calendar_dirs)} trajectories (limited by MAX_TRAJECTORIES={MAX_TRAJECTORIES})")
+    if not ('trajectory.json' in names and 'metadata.json' in names):
+        return None
+        
+    print(f"\nVerifying trajectory in {calendar_dir}...")
     
-    # Iterate through calendar directories
-    for calendar_dir in calendar_dirs:
-        dir_path = os.path.join(RESULTS_DIR, calendar_dir)
-        trajectory_path = os.path.join(dir_path, 'trajectory.json')
-        metadata_path = os.path.join(dir_path, 'metadata.json')
+    try:
+        # Load trajectory and metadata
+        trajectory = load_trajectory(trajectory_path)
+        metadata = load_metadata(metadata_path)
         
-        if not (os.path.exists(trajectory_path) and os.path.exists(metadata_path)):
-            continue
-            
-        print(f"\nVerifying trajectory in {calendar_dir}...")
+        # Settle obvious outcomes without an API call
+        prescreened = heuristic_prescreen(trajectory, metadata)
+        if prescreened:
+            print(f"   ⚠️ Prescreened as status {prescreened['status']}: {prescreened['analysis']}")
+            return {
+                'trajectory': calendar_dir,
+                'task': get_high_level_task(metadata),
+                'verification': prescreened
+            }
         
+        # Check if trajectory has any steps
+        if not trajectory:
+            print(f"   ⚠️ Trajectory is empty - no steps recorded")
+            return {
+                'trajectory': calendar_dir,
+                'task': metadata['task']['instruction']['high_level'],
+                'verification': {
+                    'status': 0,
+                    'analysis': 'Trajectory is empty - no steps recorded',
+                    'tokens_used': 0
+                }
+            }
+        
+        # Get the last step number
+        # Step keys are unpadded integers, so compare by length first and convert only the winner
         try:
-            # Load trajectory and metadata
-            trajectory = load_trajectory(trajectory_path)
-            metadata = load_metadata(metadata_path)
-            
-            # Check if trajectory has any steps
-            if not trajectory:
-                print(f"   ⚠️ Trajectory is empty - no steps recorded")
-                results.append({
-                    'trajectory': calendar_dir,
-                    'task': metadata['task']['instruction']['high_level'],
-                    'verification': {
-                        'status': 0,
-                        'analysis': 'Trajectory is empty - no steps recorded',
-                        'tokens_used': 0
+            last_step_num = int(max(trajectory.keys(), key=lambda step: (len(step), step)))
+        except ValueError:
+            print(f"   ⚠️ No valid step numbers found in trajectory")
+            return {
+                'trajectory': calendar_dir,
+                'task': metadata['task']['instruction']['high_level'],
+                'verification': {
+                    'status': 0,
+                    'analysis': 'No valid step numbers found in trajectory',
+                    'tokens_used': 0
+                }
+            }
+        
+        images_dir = f"{dir_path}{os.sep}images"
+        images_prefix = f"{images_dir}{os.sep}"
+        screenshots = []
+        if 'images' in names:
+            with os.scandir(images_dir) as it:
+                screenshots = sorted(entry.name for entry in it if entry.name.startswith('screenshot_') and entry.name.endswith('.png'))
+        
+        # Get the last step screenshot
+        last_step_name = f'screenshot_{last_step_num:03d}.png'
+        last_step_screenshot = f"{images_prefix}{last_step_name}"
+        # Get the final screenshot
+        final_name = f'screenshot_{last_step_num + 1:03d}.png'
+        final_screenshot = f"{images_prefix}{final_name}"
+
+        # Check if screenshot files exist
+        screenshot_names = set(screenshots)
+        if last_step_name not in screenshot_names or final_name not in screenshot_names:
+            # Try to find the last two screenshots in the images directory
+            if 'images' in names:
+                if len(screenshots) >= 2:
+                    last_step_screenshot = f"{images_prefix}{screenshots[-2]}"
+                    final_screenshot = f"{images_prefix}{screenshots[-1]}"
+                    print(f"   ⚠️ Using fallback screenshots: {screenshots[-2]}, {screenshots[-1]}")
+                else:
+                    print(f"   ⚠️ Not enough screenshots for fallback in {images_dir}")
+                    return {
+                        'trajectory': calendar_dir,
+                        'task': metadata['task']['instruction']['high_level'],
+                        'verification': {
+                            'status': 0,
+                            'analysis': f'Not enough screenshots for fallback in {images_dir}',
+                            'tokens_used': 0
+                        }
                     }
-                })
-                continue
-            
-            # Get the last step number
-            try:
-                last_step_num = max(int(step) for step in trajectory.keys())
-            except ValueError:
-                print(f"   ⚠️ No valid step numbers found in trajectory")
-                results.append({
+            else:
+                print(f"   ⚠️ Images directory not found: {images_dir}")
+                return {
                     'trajectory': calendar_dir,
                     'task': metadata['task']['instruction']['high_level'],
                     'verification': {
                         'status': 0,
-                        'analysis': 'No valid step numbers found in trajectory',
+                        'analysis': f'Images directory not found: {images_dir}',
                         'tokens_used': 0
                     }
-                })
+                }
+        
+        # Get all executed codes
+        executed_codes = [step['action']['playwright_code'] for step in trajectory.values()]
+        
+        # Reuse the cached verification if the inputs are unchanged
+        task_low_level = metadata['task']['instruction']['low_level']
+        cache_key = verification_cache_key(task_low_level, last_step_screenshot, final_screenshot, executed_codes)
+        if cache_key in cache:
+            print(f"   ♻️ Using cached verification")
+            return {
+                'trajectory': calendar_dir,
+                'task': metadata['task']['instruction']['high_level'],
+                'verification': {**cache[cache_key], 'tokens_used': 0}
+            }
+        
+        # Verify task completion
+        verification = verify_task_completion(
+            task_low_level,
+            last_step_screenshot,
+            final_screenshot,
+            executed_codes
+        )
+        
+        entry = {
+            'trajectory': calendar_dir,
+            'task': metadata['task']['instruction']['high_level'],
+            'verification': verification
+        }
+        
+        # Only cache and log real verdicts so errors are retried on the next run
+        if verification.get('status', 0) != 0:
+            with _CACHE_LOCK:
+                cache[cache_key] = verification
+        else:
+            entry['retry'] = True
+        
+        return entry
+        
+    except Exception as e:
+        print(f"Error processing trajectory {calendar_dir}: {str(e)}")
+        return None
+
+def verify_all_trajectories() -> Dict:
+    """Main function to verify all trajectories in the results directory.
+
+    Each result is appended to verification_results.jsonl as soon as it is
+    available; failed verifications are left out so the next run retries them.
+    Returns the summary written to verification_results.json.
+    """
+    cache = load_verification_cache()
+    saved_cache_size = len(cache)
+    
+    # Get all calendar directoriesx
+    with os.scandir(RESULTS_DIR) as it:
+        calendar_dirs = [entry.name for entry in it if entry.is_dir()]
+    
+    # Re-runs can log a trajectory more than once; the last entry wins
+    present_dirs = set(calendar_dirs)
+    logged = 0
+    latest = {}
+    for entry in iter_verification_log():
+        latest[entry['trajectory']] = entry
+        logged += 1
+    
+    # Status 0 results are not final: trajectories still here are verified again
+    # instead of being resumed past or organized into the error folder
+    latest = {
+        trajectory_name: entry for trajectory_name, entry in latest.items()
+        if trajectory_name not in present_dirs or entry['verification'].get('status', 0) != 0
+    }
+    if logged > len(latest):
+        # Drop superseded and retried entries so the log does not grow with every run
+        atomic_write_bytes(VERIFICATION_LOG_PATH, b"".join(orjson.dumps(entry) + b"\n" for entry in latest.values()))
+    
+    # Resume from the log, ignoring trajectories that have since been organized away
+    completed = set()
+    total_tokens = 0
+    for trajectory_name, entry in latest.items():
+        if trajectory_name in present_dirs:
+            completed.add(trajectory_name)
+            total_tokens += entry['verification'].get('tokens_used', 0)
+    if completed:
+        calendar_dirs = [d for d in calendar_dirs if d not in completed]
+        print(f"\n♻️ Resuming: {len(completed)} trajectories already verified")
+    count = len(completed)
+    
+    # Limit number of trajectories if MAX_TRAJECTORIES is set
+    if MAX_TRAJECTORIES is not None:
+        calendar_dirs = calendar_dirs[:MAX_TRAJECTORIES]
+        print(f"\n🔍 Verifying {len(calendar_dirs)} trajectories (limited by MAX_TRAJECTORIES={MAX_TRAJECTORIES})")
+    
+    # Verifications are bound on API latency, so run them concurrently
+    with open(VERIFICATION_LOG_PATH, 'ab') as log_file, ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [executor.submit(verify_trajectory, calendar_dir, cache) for calendar_dir in calendar_dirs]
+        for future in as_completed(futures):
+            entry = future.result()
+            if entry is None:
                 continue
             
-            # Get the last step screenshot
-            last_step_screenshot = os.path.join(dir_path, 'images', f'screenshot_{last_step_num:03d}.png')
-            # Get the final screenshot
-            final_screenshot = os.path.join(dir_path, 'images', f'screenshot_{last_step_num + 1:03d}.png')
-
-            # Check if screenshot files exist
-            if not os.path.exists(last_step_screenshot) or not os.path.exists(final_screenshot):
-                # Try to find the last two screenshots in the images directory
-                images_dir = os.path.join(dir_path, 'images')
-                if os.path.exists(images_dir):
-                    screenshots = sorted([f for f in os.listdir(images_dir) if f.startswith('screenshot_') and f.endswith('.png')])
-                    if len(screenshots) >= 2:
-                        last_step_screenshot = os.path.join(images_dir, screenshots[-2])
-                        final_screenshot = os.path.join(images_dir, screenshots[-1])
-                        print(f"   ⚠️ Using fallback screenshots: {screenshots[-2]}, {screenshots[-1]}")
-                    else:
-                        print(f"   ⚠️ Not enough screenshots for fallback in {images_dir}")
-                        results.append({
-                            'trajectory': calendar_dir,
-                            'task': metadata['task']['instruction']['high_level'],
-                            'verification': {
-                                'status': 0,
-                                'analysis': f'Not enough screenshots for fallback in {images_dir}',
-                                'tokens_used': 0
-                            }
-                        })
-                        continue
-                else:
-                    print(f"   ⚠️ Images directory not found: {images_dir}")
-                    results.append({
-                        'trajectory': calendar_dir,
-                        'task': metadata['task']['instruction']['high_level'],
-                        'verification': {
-                            'status': 0,
-                            'analysis': f'Images directory not found: {images_dir}',
-                            'tokens_used': 0
-                        }
-                    })
-                    continue
+            # Add to total tokens
+            tokens_used = entry['verification'].get('tokens_used', 0)
+            total_tokens += tokens_used
+            if tokens_used:
+                print(f"📊 Current total tokens: {total_tokens}")
             
-            # Get all executed codes
-            executed_codes = [step['action']['playwright_code'] for step in trajectory.values()]
+            # Failed API calls stay unlogged, so they are neither resumed past nor organized
+            if entry.get('retry'):
+                print(f"   🔁 {entry['trajectory']} will be verified again on the next run")
+                continue
             
-            # Verify task completion
-            verification = verify_task_completion(
-                metadata['task']['instruction']['low_level'],
-                last_step_screenshot,
-                final_screenshot,
-                executed_codes
-            )
+            log_file.write(orjson.dumps(entry) + b"\n")
+            log_file.flush()
+            count += 1
             
-            # Add to total tokens
-            total_tokens += verification.get('tokens_used', 0)
-            print(f"📊 Current total tokens: {total_tokens}")
-            
-            results.append({
-                'trajectory': calendar_dir,
-                'task': metadata['task']['instruction']['high_level'],
-                'verification': verification
-            })
-                
-        except Exception as e:
-            print(f"Error processing trajectory {calendar_dir}: {str(e)}")
-            continue
+            # The cache only grows, so its size tells how many verdicts are unsaved
+            if len(cache) - saved_cache_size >= CACHE_SAVE_INTERVAL:
+                save_verification_cache(cache)
+                saved_cache_size = len(cache)
     
-    # Save overall results
+    if len(cache) != saved_cache_size:
+        save_verification_cache(cache)
+    
+    # Save overall summary; the per-trajectory results live in the log
     results_data = {
-        'results': results,
-        'total_tokens': total_tokens
+        'count': count,
+        'total_tokens': total_tokens,
+        'token_stats': dict(TOKEN_COUNTS)
     }
-    with open(os.path.join(RESULTS_DIR, 'verification_results.json'), 'w', encoding='utf-8') as f:
-        json.dump(results_data, f, indent=2, ensure_ascii=False)
+    with open(f"{_RESULTS_DIR_PREFIX}verification_results.json", 'wb') as f:
+        f.write(orjson.dumps(results_data, option=orjson.OPT_INDENT_2))
     
+    print_token_usage_report()
     print(f"\n📊 Final total tokens used: {total_tokens}")
-    return results
+    return results_data
 
 def create_status_folders():
     """Create folders for different verification statuses."""
-    status_folders = {
-        0: os.path.join(RESULTS_DIR, 'status_0_error'),
-        1: os.path.join(RESULTS_DIR, 'status_1_perfect'),
-        2: os.path.join(RESULTS_DIR, 'status_2_inefficient'),
-        3: os.path.join(RESULTS_DIR, 'status_3_wrong_output'),
-        4: os.path.join(RESULTS_DIR, 'status_4_complete_failure')
-    }
+    for status, folder_path in STATUS_FOLDERS.items():
+        os.makedirs(folder_path, exist_ok=True)
+        logger.debug("📁 Ensured folder: %s", folder_path)
     
-    for status, folder_path in status_folders.items():
-        if not os.path.exists(folder_path):
-            os.makedirs(folder_path)
-            print(f"📁 Created folder: {folder_path}")
-        else:
-            print(f"📁 Folder already exists: {folder_path}")
-    
-    return status_folders
+    return STATUS_FOLDERS
 
-def move_trajectory_to_status_folder(trajectory_name: str, status: int, status_folders: Dict):
-    """Move a trajectory folder to the appropriate status folder."""
-    source_path = os.path.join(RESULTS_DIR, trajectory_name)
-    target_folder = status_folders.get(status)
-    
-    if not target_folder:
-        print(f"⚠️ No target folder defined for status {status}")
-        return False
-    
-    target_path = os.path.join(target_folder, trajectory_name)
-    
-    if not os.path.exists(source_path):
-        print(f"❌ Source trajectory not found: {source_path}")
-        return False
+def move_trajectory_to_status_folder(entry: os.DirEntry, target_folder: str, status: int, verbose: bool = False):
+    """Move a trajectory folder, given as its RESULTS_DIR scandir entry, to its status folder."""
+    trajectory_name = entry.name
+    source_path = entry.path
+    target_path = f"{target_folder}{os.sep}{trajectory_name}"
     
     if os.path.exists(target_path):
         print(f"⚠️ Target already exists, skipping: {target_path}")
         return False
     
     try:
-        import shutil
-        shutil.move(source_path, target_path)
-        print(f"✅ Moved {trajectory_name} to status {status} folder")
+        # Status folders live under RESULTS_DIR, so a rename is normally enough
+        try:
+            os.replace(source_path, target_path)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            shutil.move(source_path, target_path)
+        if verbose:
+            logger.info("✅ Moved %s to status %s folder", trajectory_name, status)
         return True
     except Exception as e:
         print(f"❌ Error moving {trajectory_name}: {str(e)}")
         return False
 
-def organize_trajectories():
-    """Organize trajectories based on verification status."""
+def load_processed_trajectories() -> set:
+    """Load the names of trajectories already moved by an earlier organize run."""
+    report_path = f"{_RESULTS_DIR_PREFIX}organization_report.json"
+    if not os.path.exists(report_path):
+        return set()
+    try:
+        with open(report_path, 'rb') as f:
+            return set(orjson.loads(f.read()).get('processed_trajectories', []))
+    except (orjson.JSONDecodeError, OSError):
+        return set()
+
+def organize_trajectories(verbose: bool = False):
+    """Organize trajectories based on the latest entry per trajectory in verification_results.jsonl.
+
+    Per-trajectory details are only logged when verbose is True.
+    """
     print("🔍 Loading verification results...")
-    verification_path = os.path.join(RESULTS_DIR, 'verification_results.json')
-    if not os.path.exists(verification_path):
-        print("❌ verification_results.json not found!")
+    if not os.path.exists(VERIFICATION_LOG_PATH):
+        print("❌ verification_results.jsonl not found!")
         return
-    
-    with open(verification_path, 'r', encoding='utf-8') as f:
-        verification_data = json.load(f)
+    verification_results = load_latest_verification_results().values()
     
     print("📁 Creating status folders...")
     status_folders = create_status_folders()
     
-    # Statistics
-    stats = {
-        1: 0,  # Perfect execution
-        2: 0,  # Inefficient steps
-        3: 0,  # Wrong output, good steps
-        4: 0,  # Complete failure
-        0: 0   # Error
-    }
+    # Statistics: 1 perfect, 2 inefficient, 3 wrong output, 4 complete failure, 0 error
+    stats = Counter()
     
     moved_count = 0
+    processed = load_processed_trajectories()
+    
+    # Enumerate RESULTS_DIR once instead of checking each trajectory path
+    with os.scandir(RESULTS_DIR) as it:
+        entries = {entry.name: entry for entry in it if entry.is_dir(follow_symlinks=False)}
     
     print("\n📊 Organizing trajectories...")
-    for result in verification_data.get('results', []):
+    # Group trajectories by status first, then move each group in one pass
+    buckets = defaultdict(list)
+    for result in verification_results:
         trajectory_name = result['trajectory']
-        status = result['verification']['status']
+        if trajectory_name in processed:
+            continue
+        verification = result['verification']
+        status = verification['status']
         task = result['task']
+        stats[status] += 1
         
-        # Update statistics
-        stats[status] = stats.get(status, 0) + 1
-        
-        print(f"\n📋 Trajectory: {trajectory_name}")
-        print(f"   Task: {task}")
-        print(f"   Status: {status}")
+        if verbose:
+            if status in (0, 2, 3, 4):
+                logger.info("\n📋 Trajectory: %s\n   Task: %s\n   Status: %s\n   Analysis: %s",
+                            trajectory_name, task, status, verification['analysis'])
+            else:
+                logger.info("\n📋 Trajectory: %s\n   Task: %s\n   Status: %s", trajectory_name, task, status)
         
-        if status in [0, 1, 2, 3, 4]:
-            if status in [0, 2, 3, 4]:
-                print(f"   Analysis: {result['verification']['analysis']}")
-            if move_trajectory_to_status_folder(trajectory_name, status, status_folders):
+        buckets[status].append(trajectory_name)
+    
+    moves = []
+    for status, trajectory_names in buckets.items():
+        target_folder = status_folders.get(status)
+        if not target_folder:
+            print(f"   Status {status} - keeping {len(trajectory_names)} trajectories in original location")
+            continue
+        for trajectory_name in trajectory_names:
+            entry = entries.get(trajectory_name)
+            if entry is None:
+                print(f"❌ Source trajectory not found: {_RESULTS_DIR_PREFIX}{trajectory_name}")
+                continue
+            moves.append((entry, target_folder, status))
+    
+    # Moves are independent, so run them concurrently to hide disk latency
+    with ThreadPoolExecutor(max_workers=MAX_MOVE_WORKERS) as executor:
+        moved = executor.map(lambda move: move_trajectory_to_status_folder(*move, verbose), moves)
+        for (entry, _, _), success in zip(moves, moved):
+            if success:
                 moved_count += 1
-        else:
-            print(f"   Status {status} - keeping in original location")
+                processed.add(entry.name)
+    
+    for status in (0, 1, 2, 3, 4):
+        stats.setdefault(status, 0)
     
     # Print summary
     print(f"\n📊 Organization Summary:")
@@ -818,8 +1110,9 @@ def organize_trajectories():
     
     # Save organization report
     organization_report = {
-        'organization_stats': stats,
+        'organization_stats': dict(stats),
         'moved_trajectories': moved_count,
+        'processed_trajectories': sorted(processed),
         'status_folders': {
             'status_0_error': status_folders[0],
             'status_1_perfect': status_folders[1],
@@ -829,21 +1122,25 @@ def organize_trajectories():
         }
     }
     
-    report_path = os.path.join(RESULTS_DIR, 'organization_report.json')
-    with open(report_path, 'w', encoding='utf-8') as f:
-        json.dump(organization_report, f, indent=2, ensure_ascii=False)
+    report_path = f"{_RESULTS_DIR_PREFIX}organization_report.json"
+    with open(report_path, 'wb') as f:
+        # organization_stats is keyed by int status
+        f.write(orjson.dumps(organization_report, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
     
     print(f"\n📄 Organization report saved to: {report_path}")
 
 def verify_and_organize():
     """Main function to verify all trajectories and then organize them."""
     print("🔍 Starting verification process...")
-    results = verify_all_trajectories()
+    summary = verify_all_trajectories()
     
     print("\n📁 Starting organization process...")
-    organize_trajectories()
+    organize_trajectories(verbose=VERBOSE_OUTPUT)
     
-    return results
+    return summary
 
 if __name__ == "__main__":
+    # Print this module's progress messages as plain lines
+    logging.basicConfig(format="%(message)s", stream=sys.stdout)
+    logger.setLevel(logging.INFO)
     verify_and_organize()
\ No newline at end of file
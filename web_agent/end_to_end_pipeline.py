@@ -13,6 +13,7 @@ Configure which steps to run by modifying the settings below.
 import os
 import sys
 import argparse
+import logging
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -24,10 +25,8 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 # Load environment variables
 load_dotenv()
 
-# Import the main functions from all pipeline components
-from core.pipeline_instruction import main as generate_instructions
-from core.generate_trajectory import main as generate_trajectories
-from core.verify_tasks import verify_and_organize
+# Pipeline components are imported inside their run_* functions so that
+# only the enabled steps pay for their (heavy) imports
 
 # Import all configuration from config.py
 from config import (
@@ -72,27 +71,27 @@ def setup_environment():
 
 def print_configuration():
     """Print current configuration settings."""
-    print("\n📋 Current Configuration:")
-    print(f"   🌐 Target URL: {URL}")
-    print(f"   📊 Current Phase: {PHASE}")
-    print(f"   👥 Number of accounts: {len(ACCOUNTS)}")
-    print(f"   🎭 Personas total: {TOTAL_PERSONAS}")
-    print(f"   📝 Phase 1 instructions per persona: {PHASE1_INSTRUCTIONS_PER_PERSONA}")
-    print(f"   📝 Phase 2 instructions per persona: {PHASE2_INSTRUCTIONS_PER_PERSONA}")
-    
-    print("\n🎯 Trajectory Generation Settings:")
-    print(f"   🔄 Max Retries: {MAX_RETRIES}")
-    print(f"   📏 Max Steps: {MAX_STEPS}")
-    print(f"   ⏱️ Action Timeout: {ACTION_TIMEOUT}ms")
-    print(f"   🤖 Mode: {'Interactive' if MODE == 1 else 'Automatic'}")
-    print(f"   📚 Max Context Length: {MAX_CONTEXT_LENGTH}")
-    print(f"   🧠 Knowledge Base: {KNOWLEDGE_BASE_TYPE}")
-    print(f"   🔍 Search Context: {'Enabled' if SEARCH_CONTEXT else 'Disabled'}")
-    print(f"   📊 Auto Processing: {'All Instructions' if AUTO_TRAJECTORY_PROCESSING else f'Max {MAX_INSTRUCTIONS_TO_PROCESS} Instructions'}")
-    
-    print("\n👤 Active Accounts:")
-    for i, account in enumerate(ACCOUNTS, 1):
-        print(f"   {i}. {account['email']} (range: {account['start_idx']}-{account['end_idx']})")
+    lines = [
+        "\n📋 Current Configuration:",
+        f"   🌐 Target URL: {URL}",
+        f"   📊 Current Phase: {PHASE}",
+        f"   👥 Number of accounts: {len(ACCOUNTS)}",
+        f"   🎭 Personas total: {TOTAL_PERSONAS}",
+        f"   📝 Phase 1 instructions per persona: {PHASE1_INSTRUCTIONS_PER_PERSONA}",
+        f"   📝 Phase 2 instructions per persona: {PHASE2_INSTRUCTIONS_PER_PERSONA}",
+        "\n🎯 Trajectory Generation Settings:",
+        f"   🔄 Max Retries: {MAX_RETRIES}",
+        f"   📏 Max Steps: {MAX_STEPS}",
+        f"   ⏱️ Action Timeout: {ACTION_TIMEOUT}ms",
+        f"   🤖 Mode: {'Interactive' if MODE == 1 else 'Automatic'}",
+        f"   📚 Max Context Length: {MAX_CONTEXT_LENGTH}",
+        f"   🧠 Knowledge Base: {KNOWLEDGE_BASE_TYPE}",
+        f"   🔍 Search Context: {'Enabled' if SEARCH_CONTEXT else 'Disabled'}",
+        f"   📊 Auto Processing: {'All Instructions' if AUTO_TRAJECTORY_PROCESSING else f'Max {MAX_INSTRUCTIONS_TO_PROCESS} Instructions'}",
+        "\n👤 Active Accounts:",
+    ]
+    lines.extend(f"   {i}. {account['email']} (range: {account['start_idx']}-{account['end_idx']})" for i, account in enumerate(ACCOUNTS, 1))
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def run_instruction_generation():
@@ -104,6 +103,7 @@ def run_instruction_generation():
     try:
         # Set the global variables in the pipeline_instruction module
         import core.pipeline_instruction as pi
+        from core.pipeline_instruction import main as generate_instructions
         pi.PHASE = PHASE
         pi.PERSONAHUB_DATA_PATH = PERSONAHUB_DATA_PATH
         pi.SCREENSHOT_PATH = SCREENSHOT_PATH
@@ -132,6 +132,7 @@ def run_trajectory_generation():
     try:
         # Set the global variables in the generate_trajectory module
         import core.generate_trajectory as gt
+        from core.generate_trajectory import main as generate_trajectories
         gt.PHASE = PHASE
         gt.MAX_RETRIES = MAX_RETRIES
         gt.MAX_STEPS = MAX_STEPS
@@ -163,6 +164,7 @@ def run_verify_tasks():
     print("="*60)
     
     try:
+        from core.verify_tasks import verify_and_organize
         results = verify_and_organize()
         print("\n✅ Task verification completed successfully!")
         return True
@@ -180,12 +182,14 @@ def run_verify_tasks():
 
 def show_pipeline_configuration():
     """Show which pipeline steps are enabled."""
-    print("\n🔧 Pipeline Configuration:")
-    print(f"   📝 Instruction Generation: {'✅ ENABLED' if ENABLE_INSTRUCTION_GENERATION else '❌ DISABLED'}")
-    print(f"   🎯 Trajectory Generation: {'✅ ENABLED' if ENABLE_TRAJECTORY_GENERATION else '❌ DISABLED'}")
-    print(f"   🔍 Task Verification: {'✅ ENABLED' if ENABLE_TASK_VERIFICATION else '❌ DISABLED'}")
-    print(f"   ⚡ Skip Confirmation: {'✅ YES' if SKIP_CONFIRMATION else '❌ NO'}")
-    print(f"   📊 Verbose Output: {'✅ YES' if VERBOSE_OUTPUT else '❌ NO'}")
+    sys.stdout.write("\n".join([
+        "\n🔧 Pipeline Configuration:",
+        f"   📝 Instruction Generation: {'✅ ENABLED' if ENABLE_INSTRUCTION_GENERATION else '❌ DISABLED'}",
+        f"   🎯 Trajectory Generation: {'✅ ENABLED' if ENABLE_TRAJECTORY_GENERATION else '❌ DISABLED'}",
+        f"   🔍 Task Verification: {'✅ ENABLED' if ENABLE_TASK_VERIFICATION else '❌ DISABLED'}",
+        f"   ⚡ Skip Confirmation: {'✅ YES' if SKIP_CONFIRMATION else '❌ NO'}",
+        f"   📊 Verbose Output: {'✅ YES' if VERBOSE_OUTPUT else '❌ NO'}",
+    ]) + "\n")
 
 
 def get_pipeline_description():
@@ -271,4 +275,7 @@ def main():
 
 
 if __name__ == "__main__":
+    # Verbose verification details are logged by core.verify_tasks; print them as plain lines
+    logging.basicConfig(format="%(message)s", stream=sys.stdout)
+    logging.getLogger("core.verify_tasks").setLevel(logging.INFO)
     main()
@@ -1,14 +1,19 @@
 import json
+import hashlib
+import sqlite3
 from playwright.sync_api import sync_playwright, TimeoutError
 import os
 import sys
 import uuid
 import time
 from typing import Optional, Dict
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from contextlib import nullcontext
 from dotenv import load_dotenv
 from urllib.parse import urlparse
 from datetime import datetime
+from io import BytesIO
+import orjson
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -19,9 +24,11 @@ from utils.google_auth import ensure_google_login
 from utils.trajectory_file_utils import (
     create_episode_directory, create_trajectory_file, create_error_log_file,
     update_playwright_error_log, update_trajectory, create_metadata,
-    write_user_message, generate_trajectory_html, get_site_name_from_url
+    write_user_message, generate_trajectory_html, get_site_name_from_url,
+    atomic_write_bytes, format_previous_action
 )
 from utils.progress_tracker import ProgressTracker
+from utils.browser_utils import launch_browser
 from utils.element_utils import (
     get_all_open_tabs, check_for_new_tabs, switch_to_new_tab
 )
@@ -33,20 +40,71 @@ from utils.knowledge_base_client import get_trajectory_context
 # from utils.confidence_validation import process_confidence_validation
 # from utils.post_action_validation import process_post_action_validation
 
-# OCR utilities
-from paddleocr import PaddleOCR
+# OCR utilities (PaddleOCR runs in a persistent worker process)
+import atexit
+import threading
+import multiprocessing as mp
+from multiprocessing.managers import BaseManager
+from utils.ocr_worker import OCRWorker
+from utils.ocr_cache import OCRCache
 
-# Image processing utilities
-from PIL import Image, ImageDraw, ImageFont
+# Image processing utilities (PIL is imported where it is used to keep module import light)
+import numpy as np
+
+# Optional JIT for OCR geometry on very large element sets
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Initialize OCR instance
-ocr = PaddleOCR(
-    use_doc_orientation_classify=False,
-    use_doc_unwarping=False,
-    use_textline_orientation=False)
+# OCR worker process, started on first use. Each account process starts its own;
+# only the threads of one process (interactive mode runs accounts as threads) share it.
+_ocr_worker = None
+_ocr_worker_lock = threading.Lock()
+
+
+def get_ocr_worker() -> OCRWorker:
+    """Start the OCR worker process on first use, or again after it died or hung, and return it."""
+    global _ocr_worker
+    with _ocr_worker_lock:
+        if _ocr_worker is not None and not _ocr_worker.healthy():
+            print(f"⚠️ Restarting OCR worker: {_ocr_worker.broken or 'process exited'}")
+            _ocr_worker.close()
+            _ocr_worker = None
+        if _ocr_worker is None:
+            _ocr_worker = OCRWorker()
+            atexit.register(_ocr_worker.close)
+        return _ocr_worker
+
+
+# Persistent OCR results keyed by screenshot digest. The SQLite file is shared by every
+# account process, but each process opens its own connection.
+_ocr_result_cache = None
+
+
+def get_ocr_result_cache() -> OCRCache:
+    """Open the SQLite OCR result cache on first use and return it."""
+    global _ocr_result_cache
+    with _ocr_worker_lock:
+        if _ocr_result_cache is None:
+            _ocr_result_cache = OCRCache(OCR_CACHE_PATH, max_entries=OCR_CACHE_MAX_ENTRIES)
+            atexit.register(_ocr_result_cache.close)
+        return _ocr_result_cache
+
+
+def find_ocr_element(elements_data: dict, element_id) -> Optional[dict]:
+    """Look up an OCR element by annotation ID (IDs are the element's list index)."""
+    try:
+        index = int(element_id)
+    except (TypeError, ValueError):
+        return None
+    elements = elements_data.get("elements", [])
+    if 0 <= index < len(elements) and str(elements[index].get("annotation_id")) == str(index):
+        return elements[index]
+    return None
 
 
 def execute_ocr_action(page, gpt_resp, elements_data):
@@ -62,27 +120,20 @@ def execute_ocr_action(page, gpt_resp, elements_data):
     # Handle wait actions (no element ID needed)
     if action_type == "wait":
         print(f"🎯 Executing wait action")
-        page.wait_for_timeout(2000)  # Wait for 2 seconds by default
-        print(f"✅ Waited for 2 seconds")
+        # Return as soon as the network settles, waiting at most 2 seconds
+        try:
+            page.wait_for_load_state('networkidle', timeout=2000)
+            print(f"✅ Page reached network idle")
+        except TimeoutError:
+            print(f"✅ Waited for 2 seconds")
         return
     
     if selected_element_id is None:
         raise Exception("No selected_annotation_id or selected_element_id in GPT response")
     
     # Find the element in OCR data
-    target_element = None
     print(f"🔍 Looking for element ID: {selected_element_id} (type: {type(selected_element_id)})")
-    print(f"🔍 Available elements: {[elem.get('annotation_id') for elem in elements_data.get('elements', [])]}")
-    
-    for element in elements_data.get("elements", []):
-        element_id = element.get("annotation_id")
-        print(f"🔍 Comparing {selected_element_id} (type: {type(selected_element_id)}) with {element_id} (type: {type(element_id)})")
-        # Handle both string and integer comparisons
-        if (element_id == selected_element_id or 
-            str(element_id) == str(selected_element_id) or
-            int(element_id) == int(selected_element_id)):
-            target_element = element
-            break
+    target_element = find_ocr_element(elements_data, selected_element_id)
     
     if not target_element:
         raise Exception(f"Element ID {selected_element_id} not found in OCR data")
@@ -123,18 +174,10 @@ def generate_action_code_from_ocr(gpt_resp, elements_data):
     
     # Handle wait actions (no element needed)
     if action_type == "wait":
-        return f"page.wait_for_timeout(2000)  # Wait for page to load"
+        return f"page.wait_for_load_state('networkidle', timeout=2000)  # Wait for page to load"
     
     # Find the element in OCR data
-    target_element = None
-    for element in elements_data.get("elements", []):
-        element_id = element.get("annotation_id")
-        # Handle both string and integer comparisons
-        if (element_id == selected_element_id or 
-            str(element_id) == str(selected_element_id) or
-            int(element_id) == int(selected_element_id)):
-            target_element = element
-            break
+    target_element = find_ocr_element(elements_data, selected_element_id)
     
     if not target_element:
         return f"Element ID {selected_element_id} not found"
@@ -152,41 +195,67 @@ def generate_action_code_from_ocr(gpt_resp, elements_data):
         return f"Unknown action: {action_type}"
 
 
-def update_trajectory_ocr(dirs: Dict[str, str], step_idx: int, screenshot: str, elements_data_file: str, 
-                         action_code: str, action_description: str, page, user_message_file: str = None, 
-                         llm_output=None, annotation_id: str = None) -> None:
-    """Update trajectory.json with a new step using OCR-based elements."""
-    trajectory_path = os.path.join(dirs['root'], 'trajectory.json')
-    try:
-        with open(trajectory_path, 'r', encoding='utf-8') as f:
-            trajectory = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        trajectory = {}
-    
-    # Get current page information with safety checks
+def get_page_info(page, cache: Optional[Dict] = None) -> Dict:
+    """
+    Collect URL/title information for the current page and all open tabs.
+    URLs are read locally; titles need a browser round-trip, so they are reused
+    from the cache until the set of open URLs changes.
+    """
     try:
         current_url = page.url if hasattr(page, 'url') else "Unknown"
-        page_title = page.title() if hasattr(page, 'title') else "Unknown"
         open_pages = page.context.pages if hasattr(page, 'context') else []
-        open_pages_titles = [p.title() for p in open_pages] if open_pages else []
-        open_pages_urls = [p.url for p in open_pages] if open_pages else []
+        open_pages_urls = [p.url for p in open_pages]
+        cache_key = (current_url, tuple(open_pages_urls))
+        if cache is not None and cache_key in cache:
+            return cache[cache_key]
+        
+        page_info = {
+            "url": current_url,
+            "title": page.title() if hasattr(page, 'title') else "Unknown",
+            "open_pages": {
+                "titles": [p.title() for p in open_pages],
+                "urls": open_pages_urls
+            }
+        }
+        if cache is not None:
+            cache[cache_key] = page_info
+        return page_info
     except Exception as e:
-        print(f"⚠️  Error getting page info in update_trajectory_ocr: {e}")
-        current_url = "Error getting URL"
-        page_title = "Error getting title"
-        open_pages_titles = []
-        open_pages_urls = []
+        print(f"⚠️  Error getting page info: {e}")
+        return {
+            "url": "Error getting URL",
+            "title": "Error getting title",
+            "open_pages": {
+                "titles": [],
+                "urls": []
+            }
+        }
+
+
+def update_trajectory_ocr(dirs: Dict[str, str], step_idx: int, screenshot: str, elements_data_file: str, 
+                         action_code: str, action_description: str, page, user_message_file: str = None, 
+                         llm_output=None, annotation_id: str = None, page_info: Optional[Dict] = None,
+                         elements_data: Optional[Dict] = None) -> None:
+    """
+    Record a new step using OCR-based elements.
+    Steps are appended to steps.ndjson; finalize_trajectory_ocr() assembles trajectory.json.
+    elements_data may be passed in when elements_data_file has not been written yet.
+    """
+    # Get current page information unless the caller already has it
+    if page_info is None:
+        page_info = get_page_info(page)
     
     # Load elements data and find element by annotation ID if available
     element_data = None
-    if elements_data_file and annotation_id and os.path.exists(elements_data_file):
+    if elements_data is not None and annotation_id:
+        element_data = find_ocr_element(elements_data, annotation_id)
+    elif elements_data_file and annotation_id and os.path.exists(elements_data_file):
         try:
-            with open(elements_data_file, 'r', encoding='utf-8') as f:
-                elements_data = json.load(f)
+            with open(elements_data_file, 'rb') as f:
+                elements_data = orjson.loads(f.read())
             
             # Find element by annotation_id
-            element_data = next((elem for elem in elements_data.get('elements', []) 
-                               if str(elem.get('annotation_id', '')) == str(annotation_id)), None)
+            element_data = find_ocr_element(elements_data, annotation_id)
         except Exception as e:
             print(f"⚠️ Error loading elements data: {e}")
     
@@ -196,7 +265,7 @@ def update_trajectory_ocr(dirs: Dict[str, str], step_idx: int, screenshot: str,
         action_type = "click"
     elif "page.keyboard.type" in action_code:
         action_type = "fill"
-    elif "page.wait_for_timeout" in action_code:
+    elif "page.wait_for_load_state" in action_code:
         action_type = "wait"
     
     # Get thought from LLM output
@@ -211,14 +280,7 @@ def update_trajectory_ocr(dirs: Dict[str, str], step_idx: int, screenshot: str,
             "code": action_code,
             "thought": thought
         },
-        "page": {
-            "url": current_url,
-            "title": page_title,
-            "open_pages": {
-                "titles": open_pages_titles,
-                "urls": open_pages_urls
-            }
-        },
+        "page": page_info,
         "screenshot": screenshot,
         "elements_data_file": elements_data_file,
         "timestamp": datetime.now().isoformat()
@@ -246,18 +308,35 @@ def update_trajectory_ocr(dirs: Dict[str, str], step_idx: int, screenshot: str,
         except Exception as e:
             print(f"⚠️ Error reading user message: {e}")
     
-    # Initialize steps array if not exists
-    if "steps" not in trajectory:
-        trajectory["steps"] = []
-    
-    # Add the new step
-    trajectory["steps"].append(step_data)
+    # Append the new step as one line instead of rewriting the whole trajectory
+    try:
+        with open(os.path.join(dirs['root'], 'steps.ndjson'), 'ab') as f:
+            f.write(orjson.dumps(step_data) + b"\n")
+        print(f"✅ Recorded step {step_idx + 1} in steps.ndjson")
+    except Exception as e:
+        print(f"❌ Error saving trajectory step: {e}")
+
+
+def finalize_trajectory_ocr(dirs: Dict[str, str]) -> None:
+    """Assemble trajectory.json from the append-only steps log at the end of an episode."""
+    steps = []
+    try:
+        with open(os.path.join(dirs['root'], 'steps.ndjson'), 'rb') as f:
+            for line in f:
+                try:
+                    steps.append(orjson.loads(line))
+                except orjson.JSONDecodeError:
+                    continue  # Skip a line torn by a crash mid-write
+    except FileNotFoundError:
+        pass
     
-    # Save updated trajectory
+    trajectory = {"steps": steps} if steps else {}
     try:
-        with open(trajectory_path, 'w', encoding='utf-8') as f:
-            json.dump(trajectory, f, indent=2, ensure_ascii=False)
-        print(f"✅ Updated trajectory.json with step {step_idx + 1}")
+        atomic_write_bytes(
+            os.path.join(dirs['root'], 'trajectory.json'),
+            orjson.dumps(trajectory, option=orjson.OPT_INDENT_2)
+        )
+        print(f"✅ Wrote trajectory.json with {len(steps)} steps")
     except Exception as e:
         print(f"❌ Error saving trajectory: {e}")
 
@@ -272,6 +351,13 @@ ACTION_TIMEOUT = 10000  # 10 seconds timeout for actions
 # 0 - Automatic Mode: Processes all instructions without manual intervention
 # 1 - Interactive Mode: Requires Enter press after each instruction for manual review
 MODE = 0
+# Write annotated OCR screenshots even in automatic mode (always written in interactive mode)
+DEBUG_ANNOTATED = False
+OCR_SCREENSHOT_QUALITY = int(os.getenv("OCR_SCREENSHOT_QUALITY", "85"))  # JPEG quality for annotated screenshots
+OCR_MAX_SIDE = int(os.getenv("OCR_MAX_SIDE", "1024"))  # Long side (px) screenshots are downscaled to before OCR
+OCR_MIN_CONFIDENCE = float(os.getenv("OCR_MIN_CONFIDENCE", "0.6"))  # OCR detections scored below this are dropped
+OCR_CACHE_PATH = os.path.join(RESULTS_DIR, "ocr_cache.sqlite3")  # Persistent OCR results keyed by screenshot digest
+OCR_CACHE_MAX_ENTRIES = 5000  # Least recently used results are evicted past this many entries
 
 # Knowledge base configuration
 MAX_CONTEXT_LENGTH = int(os.getenv("MAX_CONTEXT_LENGTH", "3000"))  # Maximum context length in characters
@@ -304,13 +390,53 @@ def fetch_trajectory_nodes(
         kb_type=KNOWLEDGE_BASE_TYPE
     )
 
+def _concat_ranges(starts: np.ndarray, stops: np.ndarray):
+    """Concatenate np.arange(start, stop) for every pair without a Python loop."""
+    lengths = np.maximum(stops - starts, 0)
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.repeat(starts, lengths) + offsets, lengths
+
+
 def annotate_screenshot_with_ocr_boxes(screenshot_path: str, elements_data: dict, output_path: str) -> str:
     """
     Create an annotated screenshot with OCR bounding boxes.
     """
+    from PIL import Image, ImageDraw, ImageFont
+    
     try:
         # Load the screenshot
-        image = Image.open(screenshot_path)
+        image = Image.open(screenshot_path).convert('RGB')
+        elements = [e for e in elements_data.get('elements', []) if e.get('bounding_box')]
+        
+        # Paint the 2px red outline of every box with a handful of NumPy writes, using the
+        # same segments as PIL's draw.rectangle(width=2); pixels outside the image are dropped
+        if elements:
+            arr = np.asarray(image).copy()
+            height, width = arr.shape[:2]
+            boxes = np.array([[e['bounding_box'][k] for k in ('x1', 'y1', 'x2', 'y2')] for e in elements], dtype=np.int64)
+            # PIL rejects inverted boxes
+            boxes = boxes[(boxes[:, 2] >= boxes[:, 0]) & (boxes[:, 3] >= boxes[:, 1])]
+            x1, y1, x2, y2 = boxes.T
+            
+            # Top and bottom edges: rows y1, y1 + 1, y2 - 1 and y2 across x1..x2
+            cols, lengths = _concat_ranges(np.maximum(x1, 0), np.minimum(x2 + 1, width))
+            for rows in (y1, y1 + 1, y2 - 1, y2):
+                rows = np.repeat(rows, lengths)
+                inside = (rows >= 0) & (rows < height)
+                arr[rows[inside], cols[inside]] = (255, 0, 0)
+            
+            # Left and right edges: PIL draws from y1 + 2 towards y2 - 1, excluding the end row
+            start, end = y1 + 2, y2 - 1
+            row_start = np.maximum(np.where(start < end, start, end + 1), 0)
+            row_stop = np.minimum(np.where(start < end, end, start + 1), height)
+            rows, lengths = _concat_ranges(row_start, row_stop)
+            for cols in (x1, x1 + 1, x2 - 1, x2):
+                cols = np.repeat(cols, lengths)
+                inside = (cols >= 0) & (cols < width)
+                arr[rows[inside], cols[inside]] = (255, 0, 0)
+            
+            image = Image.fromarray(arr)
+        
         draw = ImageDraw.Draw(image)
         
         # Try to use a default font, fallback to basic if not available
@@ -319,27 +445,22 @@ def annotate_screenshot_with_ocr_boxes(screenshot_path: str, elements_data: dict
         except:
             font = None
         
-        # Draw bounding boxes for each OCR element
-        for element in elements_data.get('elements', []):
-            bbox = element.get('bounding_box', {})
+        # Draw the annotation labels for each OCR element
+        for element in elements:
+            bbox = element['bounding_box']
             text = element.get('text', '')
             annotation_id = element.get('annotation_id', '?')
+            x1, y1 = bbox['x1'], bbox['y1']
             
-            if bbox:
-                x1, y1, x2, y2 = bbox['x1'], bbox['y1'], bbox['x2'], bbox['y2']
-                
-                # Draw bounding box
-                draw.rectangle([x1, y1, x2, y2], outline='red', width=2)
-                
-                # Draw annotation ID and text
-                label = f"{annotation_id}: {text}"
-                if font:
-                    draw.text((x1, y1 - 20), label, fill='red', font=font)
-                else:
-                    draw.text((x1, y1 - 20), label, fill='red')
+            # Draw annotation ID and text
+            label = f"{annotation_id}: {text}"
+            if font:
+                draw.text((x1, y1 - 20), label, fill='red', font=font)
+            else:
+                draw.text((x1, y1 - 20), label, fill='red')
         
-        # Save the annotated image
-        image.save(output_path)
+        # Save the annotated image as JPEG (much cheaper to encode than PNG)
+        image.save(output_path, 'JPEG', quality=OCR_SCREENSHOT_QUALITY, optimize=False)
         print(f"✅ Created annotated screenshot with OCR bounding boxes: {output_path}")
         return output_path
         
@@ -348,63 +469,190 @@ def annotate_screenshot_with_ocr_boxes(screenshot_path: str, elements_data: dict
         return screenshot_path
 
 
-def get_ocr_element_data(screenshot_path: str) -> dict:
+def _compute_geometry_numpy(boxes: np.ndarray, scale: float) -> np.ndarray:
+    """Map OCR boxes back to page coordinates; rows are (x1, y1, x2, y2, click_x, click_y)."""
+    xy = np.rint(boxes / scale).astype(np.int64)
+    return np.hstack((xy, (xy[:, :2] + xy[:, 2:]) // 2))
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _compute_geometry(boxes, scale):
+        """Compiled version of _compute_geometry_numpy without temporary arrays."""
+        n = boxes.shape[0]
+        out = np.empty((n, 6), np.int64)
+        for i in range(n):
+            x1 = int(np.rint(boxes[i, 0] / scale))
+            y1 = int(np.rint(boxes[i, 1] / scale))
+            x2 = int(np.rint(boxes[i, 2] / scale))
+            y2 = int(np.rint(boxes[i, 3] / scale))
+            out[i, 0] = x1
+            out[i, 1] = y1
+            out[i, 2] = x2
+            out[i, 3] = y2
+            out[i, 4] = (x1 + x2) // 2
+            out[i, 5] = (y1 + y2) // 2
+        return out
+else:
+    _compute_geometry = _compute_geometry_numpy
+
+
+def get_ocr_element_data(screenshot_path: str, screenshot_bytes: Optional[bytes] = None) -> dict:
     """
     Get element data using OCR instead of comprehensive element detection.
     Returns organized JSON structure with text elements and bounding boxes.
+    Pass the bytes returned by page.screenshot() to decode in memory instead of re-reading the file.
     """
+    from PIL import Image
+    
     try:
         print(f"🔍 Running OCR on screenshot: {screenshot_path}")
-        result = ocr.predict(input=screenshot_path)
+        # Downscale so the long side fits the detector's working resolution;
+        # boxes are mapped back to page coordinates below
+        pil_image = Image.open(BytesIO(screenshot_bytes) if screenshot_bytes is not None else screenshot_path).convert('RGB')
+        width, height = pil_image.size
+        scale = min(1.0, OCR_MAX_SIDE / max(width, height))
+        if scale < 1.0:
+            pil_image = pil_image.resize((int(width * scale), int(height * scale)), Image.BILINEAR)
         
-        # Process results and create organized JSON structure
-        for res in result:
-            # Create organized JSON structure
-            organized_data = {
-                "image_path": screenshot_path,
-                "elements": []
-            }
-            
-            # Access the data from the result object
-            result_data = res.res if hasattr(res, 'res') else res
-            
-            # Combine text and bounding boxes into individual objects
-            texts = result_data['rec_texts']
-            boxes = result_data['rec_boxes'] 
-            scores = result_data['rec_scores']
-            
-            for i, (text, box, score) in enumerate(zip(texts, boxes, scores)):
-                x1, y1, x2, y2 = int(box[0]), int(box[1]), int(box[2]), int(box[3])
-                
-                # Calculate click coordinates (center of bounding box)
-                click_x = (x1 + x2) // 2
-                click_y = (y1 + y2) // 2
-                
-                text_element = {
-                    "annotation_id": i,
-                    "text": text,
-                    "confidence": float(score),
-                    "bounding_box": {
-                        "x1": x1,
-                        "y1": y1, 
-                        "x2": x2,
-                        "y2": y2
-                    },
-                    "click_coordinates": {
-                        "x": click_x,
-                        "y": click_y
-                    }
+        # Decode to a BGR array and hand it to the worker through shared memory
+        image = np.asarray(pil_image)[:, :, ::-1]
+        result_data = get_ocr_worker().predict(image)
+        
+        # Create organized JSON structure
+        organized_data = {
+            "image_path": screenshot_path,
+            "scale": scale,
+            "elements": []
+        }
+        
+        # Combine text and bounding boxes into individual objects
+        texts = result_data['rec_texts']
+        boxes = np.asarray(result_data['rec_boxes'], dtype=np.float64).reshape(-1, 4)
+        scores = np.asarray(result_data['rec_scores'], dtype=np.float64).reshape(-1)
+        
+        # Drop low-confidence detections before building any element dicts
+        keep = scores >= OCR_MIN_CONFIDENCE
+        if not keep.all():
+            texts = [text for text, kept in zip(texts, keep.tolist()) if kept]
+            boxes = boxes[keep]
+            scores = scores[keep]
+        
+        # Map boxes back to page coordinates and compute click coordinates
+        # (center of bounding box) for all elements at once
+        geometry = _compute_geometry(boxes, scale)
+        
+        organized_data["elements"] = [
+            {
+                "annotation_id": i,
+                "text": text,
+                "confidence": score,
+                "bounding_box": {
+                    "x1": x1,
+                    "y1": y1,
+                    "x2": x2,
+                    "y2": y2
+                },
+                "click_coordinates": {
+                    "x": click_x,
+                    "y": click_y
                 }
-                organized_data["elements"].append(text_element)
-            
-            print(f"✅ OCR detected {len(organized_data['elements'])} text elements")
-            return organized_data
-            
+            }
+            for i, (text, (x1, y1, x2, y2, click_x, click_y), score)
+            in enumerate(zip(texts, geometry.tolist(), scores.tolist()))
+        ]
+        
+        print(f"✅ OCR detected {len(organized_data['elements'])} text elements")
+        return organized_data
+        
     except Exception as e:
         print(f"❌ OCR failed: {e}")
         return {"image_path": screenshot_path, "elements": []}
+
+
+def get_ocr_element_data_cached(screenshot_bytes: bytes, screenshot_path: str, ocr_cache: Dict,
+                                persist: bool = True) -> dict:
+    """
+    Run OCR on a screenshot unless it is byte-identical to the previous one
+    or to any screenshot already in the persistent OCR result cache.
+    New results are only added to the persistent cache when persist is True.
+    """
+    digest = hashlib.blake2b(screenshot_bytes, digest_size=16).digest()
+    if ocr_cache.get("digest") == digest:
+        print("♻️ Screenshot unchanged, reused OCR")
+        return {**ocr_cache["elements_data"], "image_path": screenshot_path}
+    
+    # Results depend on the OCR input resolution and confidence cutoff, so both are part of the key
+    cache_key = f"{digest.hex()}:{OCR_MAX_SIDE}:{OCR_MIN_CONFIDENCE}"
+    try:
+        elements_data = get_ocr_result_cache().get(cache_key)
+    except sqlite3.Error as e:
+        # The cache is only an optimization; treat failures as a miss
+        print(f"⚠️ OCR cache lookup failed, running OCR: {e}")
+        elements_data = None
+    if elements_data is not None:
+        print("♻️ Screenshot seen before, reused cached OCR")
+        elements_data["image_path"] = screenshot_path
+    else:
+        elements_data = get_ocr_element_data(screenshot_path, screenshot_bytes)
+        # Only remember successful runs so a failed OCR is retried on the next capture
+        if persist and elements_data["elements"]:
+            try:
+                get_ocr_result_cache().put(cache_key, elements_data)
+            except sqlite3.Error as e:
+                print(f"⚠️ OCR cache store failed: {e}")
+    
+    if elements_data["elements"]:
+        ocr_cache["digest"] = digest
+        ocr_cache["elements_data"] = elements_data
+    return elements_data
+
+
+def dump_json(obj, path: str) -> None:
+    """Write an indented JSON file with orjson in a single atomic write."""
+    atomic_write_bytes(path, orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+
+
+def dump_elements_data(elements_data: dict) -> bytes:
+    """
+    Serialize OCR element data once so every file for the step can reuse it.
+    These files are machine-read, so they are written compact (trajectory.json stays indented).
+    """
+    return orjson.dumps(elements_data)
+
+
+def save_ocr_artifacts(screenshot_path: str, elements_data: dict, elements_payload: bytes, axtree_file: str,
+                       elements_data_file: str, annotated_path: Optional[str] = None,
+                       screenshot_bytes: Optional[bytes] = None) -> None:
+    """Write the screenshot (when given as bytes), OCR element data files and the annotated screenshot for a step."""
+    if screenshot_bytes is not None:
+        atomic_write_bytes(screenshot_path, screenshot_bytes)
+    
+    # Write elements data once to the axtree file and hard-link the targeting data file to it
+    atomic_write_bytes(axtree_file, elements_payload)
+    try:
+        link_path = elements_data_file + '.tmp'
+        os.link(axtree_file, link_path)
+        os.replace(link_path, elements_data_file)
+    except OSError:
+        # Filesystems without hard links get a second copy
+        atomic_write_bytes(elements_data_file, elements_payload)
+    
+    # Create annotated screenshot with OCR bounding boxes (only when it will be reviewed)
+    if annotated_path:
+        annotate_screenshot_with_ocr_boxes(screenshot_path, elements_data, annotated_path)
+
+
+def wait_for_artifacts(artifacts_future) -> None:
+    """Wait for a background save_ocr_artifacts() call; a failed write only loses that step's files."""
+    if artifacts_future is None:
+        return
+    try:
+        artifacts_future.result()
+    except Exception as e:
+        print(f"⚠️ Failed to save step artifacts: {e}")
     
-def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_idx, email: Optional[str] = None, password: Optional[str] = None, progress_tracker=None):
+def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_idx, email: Optional[str] = None, password: Optional[str] = None, progress_tracker=None, browser=None):
         
     phase_file = os.path.join(RESULTS_DIR, f"instructions_phase{phase}.json")
     try:
@@ -433,19 +681,24 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
         print(f"❌ Invalid range: total={total}, requested={start_idx}-{end_idx}")
         return
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch_persistent_context(
-            user_data_dir=user_data_dir,
-            executable_path=chrome_path,
-            headless=False,
-            args=[
-                "--disable-blink-features=AutomationControlled",
-                "--start-fullscreen"
-            ]
-        )
+    # Use a pre-launched browser when given, otherwise launch and own one
+    owns_browser = browser is None
+    with sync_playwright() if owns_browser else nullcontext() as p:
+        if owns_browser:
+            browser = launch_browser(p, user_data_dir, chrome_path)
+        # Background worker for per-step file writes so they overlap the GPT call
+        io_executor = ThreadPoolExecutor(max_workers=2)
+        # Record pages as the context opens them, so steps that open no tab skip
+        # enumerating (and fetching the title of) every open tab
+        opened_pages = []
+        def record_opened_page(new_page):
+            opened_pages.append(new_page)
+        browser.on("page", record_opened_page)
         try:
-            # Create page once at the start
-            page = browser.new_page()
+            # Create page once at the start and keep it across instructions; a persistent
+            # context opens with a blank tab, so use that instead of adding a second one
+            blank_pages = [existing for existing in browser.pages if existing.url == "about:blank"]
+            page = blank_pages[0] if blank_pages else browser.new_page()
             page.set_default_timeout(ACTION_TIMEOUT)
             
             # Set mobile viewport for mobile view detection (optional)
@@ -497,6 +750,7 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                 ensure_google_login(page, email, password, url)
 
                 execution_history = []
+                previous_actions = ""  # Pre-rendered Previous Actions lines, extended one step at a time
                 task_summarizer = []
                 current_goal = aug
                 should_continue = True
@@ -509,11 +763,23 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                 
                 # Initialize tab tracking
                 initial_tabs = get_all_open_tabs(browser)
+                opened_pages.clear()  # Pages opened while navigating and logging in are in initial_tabs
                 previous_tab_count = len(initial_tabs)
                 previous_tab_urls = {tab['url'] for tab in initial_tabs}
                 print(f"📑 Initial tabs: {previous_tab_count}")
+                
+                # Page titles keyed by open tab URLs, so unchanged tabs skip the title round-trips
+                tab_metadata_cache = {}
+                # Digest and OCR output of the last screenshot, to skip OCR on unchanged frames
+                ocr_cache = {}
+                # Speculative OCR of the frame seen right after the last action
+                ocr_prefetch = None
+                artifacts_future = None
 
                 while should_continue:
+                    # The previous step's files must be on disk before this step can end the episode
+                    wait_for_artifacts(artifacts_future)
+                    artifacts_future = None
                     step_idx = len(task_summarizer)
                     
                     # Update progress tracker with current step
@@ -529,9 +795,9 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                         )
                         if gpt_resp and "output" in gpt_resp:
                             metadata["gpt_output"] = gpt_resp["output"]
-                        with open(os.path.join(dirs['root'], 'metadata.json'), 'w', encoding='utf-8') as f:
-                            json.dump(metadata, f, indent=2, ensure_ascii=False)
+                        dump_json(metadata, os.path.join(dirs['root'], 'metadata.json'))
                         # Generate HTML after metadata is created
+                        finalize_trajectory_ocr(dirs)
                         generate_trajectory_html(dirs, metadata)
                         
                         # Mark instruction as failed in progress tracker
@@ -541,34 +807,29 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                         break
 
                     screenshot = os.path.join(dirs['images'], f"screenshot_{step_idx+1:03d}.png")
-                    annotated_screenshot = os.path.join(dirs['annotated_images'], f"annotated_screenshot_{step_idx+1:03d}.png")
+                    annotated_screenshot = os.path.join(dirs['annotated_images'], f"annotated_screenshot_{step_idx+1:03d}.jpg") if DEBUG_ANNOTATED or MODE == 1 else None
                     axtree_file = os.path.join(dirs['axtree'], f"axtree_{step_idx+1:03d}.txt")
                     elements_data_file = os.path.join(dirs['targeting_data'], f"elements_data_{step_idx+1:03d}.json")
                     try:
-                        page.screenshot(path=screenshot)
+                        # Keep the capture in memory; it is only written once the step is kept
+                        screenshot_bytes = page.screenshot()
+                        
+                        # Let any speculative OCR land in ocr_cache before looking this frame up
+                        if ocr_prefetch:
+                            try:
+                                ocr_prefetch.result()
+                            except Exception as e:
+                                # Speculation is best effort; the OCR call below covers this frame
+                                print(f"⚠️ Speculative OCR failed: {e}")
+                            ocr_prefetch = None
                         
                         # Get OCR-based element data instead of comprehensive element detection
                         print(f"🔍 Running OCR for step {step_idx+1}...")
-                        elements_data = get_ocr_element_data(screenshot)
+                        elements_data = get_ocr_element_data_cached(screenshot_bytes, screenshot, ocr_cache)
                         
                         # Use elements data as the "tree" for GPT
                         tree = elements_data
-                        
-                        # Save elements data to axtree file
-                        with open(axtree_file, 'w', encoding='utf-8') as f:
-                            json.dump(elements_data, f, indent=2, ensure_ascii=False)
-                        
-                        # Save elements data to targeting data file
-                        with open(elements_data_file, 'w', encoding='utf-8') as f:
-                            json.dump(elements_data, f, indent=2, ensure_ascii=False)
-                        
-                        # Create annotated screenshot with OCR bounding boxes
-                        print(f"🎨 Creating annotated screenshot with OCR bounding boxes...")
-                        annotated_path = annotate_screenshot_with_ocr_boxes(
-                            screenshot, 
-                            elements_data, 
-                            annotated_screenshot
-                        )
+                        elements_payload = dump_elements_data(elements_data)
                         
                         print(f"✅ OCR detected {len(elements_data['elements'])} text elements")
                         
@@ -583,10 +844,9 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                                 # Handle login again
                                 ensure_google_login(page, email, password, url)
                                 # Retry the screenshot and tree capture
-                                page.screenshot(path=screenshot)
+                                screenshot_bytes = page.screenshot(path=screenshot)
                                 tree = page.accessibility.snapshot()
-                                with open(axtree_file, 'w', encoding='utf-8') as f:
-                                    json.dump(tree, f, indent=2, ensure_ascii=False)
+                                atomic_write_bytes(axtree_file, orjson.dumps(tree))
                             except Exception as recovery_error:
                                 print(f"❌ Recovery failed: {str(recovery_error)}")
                                 runtime = time.time() - start_time
@@ -598,8 +858,8 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                                 # Add GPT response output to metadata if available
                                 if gpt_resp and "output" in gpt_resp:
                                     metadata["gpt_output"] = gpt_resp["output"]
-                                with open(os.path.join(dirs['root'], 'metadata.json'), 'w', encoding='utf-8') as f:
-                                    json.dump(metadata, f, indent=2, ensure_ascii=False)
+                                dump_json(metadata, os.path.join(dirs['root'], 'metadata.json'))
+                                finalize_trajectory_ocr(dirs)
                                 generate_trajectory_html(dirs, metadata)
                                 should_continue = False
                                 break
@@ -614,8 +874,8 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                             # Add GPT response output to metadata if available
                             if gpt_resp and "output" in gpt_resp:
                                 metadata["gpt_output"] = gpt_resp["output"]
-                            with open(os.path.join(dirs['root'], 'metadata.json'), 'w', encoding='utf-8') as f:
-                                json.dump(metadata, f, indent=2, ensure_ascii=False)
+                            dump_json(metadata, os.path.join(dirs['root'], 'metadata.json'))
+                            finalize_trajectory_ocr(dirs)
                             generate_trajectory_html(dirs, metadata)
                             should_continue = False
                             break
@@ -640,7 +900,7 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                         f.write(f"URL: {url}\n")
                         f.write(f"Task Goal: {aug}\n")
                         f.write(f"Trajectory Context: {enhanced_context}\n")
-                        f.write(f"Elements Data Sent to GPT:\n{json.dumps(elements_data, indent=2) if elements_data else 'No elements data'}")
+                        f.write(f"Elements Data Sent to GPT:\n{elements_payload.decode('utf-8') if elements_data else 'No elements data'}")
                     print(f"📝 Saved GPT summary for debugging: {gpt_summary_file}")
                     
                     gpt_resp = chat_ai_playwright_code_ocr(
@@ -650,6 +910,7 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                         image_path=screenshot,  # Pass only the clean screenshot
                         elements_data=elements_data,
                         failed_codes=[],
+                        image_bytes=screenshot_bytes,
                         is_deletion_task=is_del,
                         url=url,
                         trajectory_context=enhanced_context,
@@ -671,6 +932,9 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                     # Handle case where GPT response is None
                     if gpt_resp is None:
                         print("❌ GPT returned no response")
+                        # Keep the final frame for the report
+                        save_ocr_artifacts(screenshot, elements_data, elements_payload, axtree_file,
+                                           elements_data_file, annotated_screenshot, screenshot_bytes)
                         runtime = time.time() - start_time
                         metadata = create_metadata(
                             persona, url, orig, aug, None,  # Pass None for final_instruction
@@ -679,9 +943,9 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                         )
                         if gpt_resp and "output" in gpt_resp:
                             metadata["gpt_output"] = gpt_resp["output"]
-                        with open(os.path.join(dirs['root'], 'metadata.json'), 'w', encoding='utf-8') as f:
-                            json.dump(metadata, f, indent=2, ensure_ascii=False)
+                        dump_json(metadata, os.path.join(dirs['root'], 'metadata.json'))
                         # Generate HTML after metadata is created
+                        finalize_trajectory_ocr(dirs)
                         generate_trajectory_html(dirs, metadata)
                         should_continue = False
                         break
@@ -692,6 +956,9 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                         print(f"📊 Current total tokens: {total_tokens}")
 
                     if "summary_instruction" in gpt_resp:
+                        # Keep the final frame for the report
+                        save_ocr_artifacts(screenshot, elements_data, elements_payload, axtree_file,
+                                           elements_data_file, annotated_screenshot, screenshot_bytes)
                         runtime = time.time() - start_time
                         metadata = create_metadata(
                             persona, url, orig, aug, gpt_resp['summary_instruction'],
@@ -700,9 +967,9 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                         )
                         if gpt_resp and "output" in gpt_resp:
                             metadata["gpt_output"] = gpt_resp["output"]
-                        with open(os.path.join(dirs['root'], 'metadata.json'), 'w', encoding='utf-8') as f:
-                            json.dump(metadata, f, indent=2, ensure_ascii=False)
+                        dump_json(metadata, os.path.join(dirs['root'], 'metadata.json'))
                         # Generate HTML after metadata is created
+                        finalize_trajectory_ocr(dirs)
                         generate_trajectory_html(dirs, metadata)
                         print("✅ Task completed, metadata saved.")
                         
@@ -732,19 +999,34 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                             
                             # Post-action validation disabled for OCR approach
                             
+                            # The step is kept, so write its screenshot and OCR artifacts in the background
+                            if annotated_screenshot:
+                                print(f"🎨 Creating annotated screenshot with OCR bounding boxes...")
+                            artifacts_future = io_executor.submit(
+                                save_ocr_artifacts,
+                                screenshot,
+                                elements_data,
+                                elements_payload,
+                                axtree_file,
+                                elements_data_file,
+                                annotated_screenshot,
+                                screenshot_bytes
+                            )
+                            
                             # ALWAYS record the successful step first (regardless of new tabs)
                             execution_history.append({
                                 'step': description, 
                                 'code': code
                             })
+                            if previous_actions:
+                                previous_actions += "\n"
+                            previous_actions += format_previous_action(len(execution_history), description, code)
+                            # Reference the saved elements file rather than keeping every step's tree in memory
                             task_summarizer.append({
                                 'step': description, 
                                 'code': code, 
-                                'axtree': tree
+                                'axtree_path': axtree_file
                             })
-                            # Save axtree to file only after successful execution
-                            with open(axtree_file, 'w', encoding='utf-8') as f:
-                                json.dump(tree, f, indent=2, ensure_ascii=False)
                             # Update trajectory.json with the successful step
                             action_code = generate_action_code_from_ocr(gpt_resp, elements_data)
                             update_trajectory_ocr(
@@ -755,9 +1037,10 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                                 action_code=action_code,
                                 action_description=description,
                                 page=page,
-                                user_message_file=os.path.join(dirs['user_message'], f"user_message_{step_idx+1:03d}.txt"),
                                 llm_output=gpt_resp,
-                                annotation_id=gpt_resp.get('selected_annotation_id') if gpt_resp else None
+                                annotation_id=gpt_resp.get('selected_annotation_id') if gpt_resp else None,
+                                page_info=get_page_info(page, tab_metadata_cache),
+                                elements_data=elements_data
                             )
                             
                             # Simple tab switching: after successful execution, check for new tabs
@@ -765,27 +1048,27 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                             print(f"   Previous tab count: {previous_tab_count}")
                             print(f"   Previous tab URLs: {list(previous_tab_urls)[:3]}...")  # Show first 3 URLs
                             
-                            has_new_tabs, new_tabs, current_tab_count = check_for_new_tabs(
-                                browser, previous_tab_count, previous_tab_urls
-                            )
+                            if opened_pages:
+                                opened_pages.clear()
+                                has_new_tabs, new_tabs, current_tab_count, current_tab_urls = check_for_new_tabs(
+                                    browser, previous_tab_count, previous_tab_urls
+                                )
+                            else:
+                                has_new_tabs = False
                             
                             if has_new_tabs:
                                 print(f"🆕 New tabs detected! Switching to new tab and restarting loop...")
                                 print(f"   New tabs: {[tab['domain'] for tab in new_tabs]}")
                                 print(f"   Current tab count: {current_tab_count}")
                                 
-                                # Wait a few seconds for the new tab to stabilize
-                                print("⏳ Waiting 8 seconds for new tab to stabilize...")
-                                time.sleep(8)
-                                
-                                # Switch to the new tab
+                                # Switch to the new tab (waits for it to finish loading)
                                 success, new_page = switch_to_new_tab(new_tabs, page)
                                 
                                 if success:
                                     # Update our page reference and tracking variables
                                     page = new_page
                                     previous_tab_count = current_tab_count
-                                    previous_tab_urls = {tab['url'] for tab in get_all_open_tabs(browser)}
+                                    previous_tab_urls = current_tab_urls
                                     
                                     # Update the URL variable so GPT gets the correct context
                                     url = page.url
@@ -801,7 +1084,7 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                                     print("⚠️  Failed to switch to new tab, continuing with current page")
                                     # Update tracking even if switch failed
                                     previous_tab_count = current_tab_count
-                                    previous_tab_urls = {tab['url'] for tab in get_all_open_tabs(browser)}
+                                    previous_tab_urls = current_tab_urls
                             else:
                                 print("✅ No new tabs detected, continuing with current page")
                                 # Only record the step if we didn't switch to a new tab
@@ -821,6 +1104,10 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                                 success = True
                         except Exception as e:
                             print(f"⚠️ Attempt {retry + 1} failed: {e}")
+                            # The attempt may have started writing this step's files; a later attempt
+                            # rewrites the same paths, so let that write finish first
+                            wait_for_artifacts(artifacts_future)
+                            artifacts_future = None
                             
 
                             
@@ -852,24 +1139,18 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                             
                             if retry < MAX_RETRIES:
                                 print("🔄 Retrying GPT for new code...")
-                                page.screenshot(path=screenshot)
+                                # Always re-capture: a failed attempt may still have typed, toggled or scrolled.
+                                # When the frame is byte-identical, ocr_cache skips the OCR run.
+                                screenshot_bytes = page.screenshot()
                                 
                                 # Get OCR element data for retry
                                 print(f"🔍 Running OCR for retry {retry + 1}...")
-                                elements_data = get_ocr_element_data(screenshot)
+                                elements_data = get_ocr_element_data_cached(screenshot_bytes, screenshot, ocr_cache)
                                 
                                 # Use elements data as the "tree"
                                 tree = elements_data
+                                elements_payload = dump_elements_data(elements_data)
                                 
-                                # Save elements data to axtree file for retry
-                                with open(axtree_file, 'w', encoding='utf-8') as f:
-                                    json.dump(elements_data, f, indent=2, ensure_ascii=False)
-                                
-                                # Save the elements data
-                                with open(elements_data_file, 'w', encoding='utf-8') as f:
-                                    json.dump(elements_data, f, indent=2, ensure_ascii=False)
-                                
-                                # Skip annotated screenshot for retry (OCR doesn't need it)
                                 print(f"✅ OCR retry completed with {len(elements_data['elements'])} text elements")
                                 
                                 error_log = str(e)
@@ -892,6 +1173,7 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                                         image_path=screenshot,  # Pass only the clean screenshot
                                         elements_data=elements_data,
                                         failed_codes=failed_codes,
+                                        image_bytes=screenshot_bytes,
                                         is_deletion_task=is_del,
                                         url=url,
                                         error_log=error_log,
@@ -904,6 +1186,9 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                                     print(f"📊 Current total tokens: {total_tokens}")
 
                                 if gpt_resp and "summary_instruction" in gpt_resp:
+                                    # Keep the final frame for the report
+                                    save_ocr_artifacts(screenshot, elements_data, elements_payload, axtree_file,
+                                                       elements_data_file, annotated_screenshot, screenshot_bytes)
                                     runtime = time.time() - start_time
                                     metadata = create_metadata(
                                         persona, url, orig, aug, gpt_resp['summary_instruction'],
@@ -912,9 +1197,9 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                                     )
                                     if gpt_resp and "output" in gpt_resp:
                                         metadata["gpt_output"] = gpt_resp["output"]
-                                    with open(os.path.join(dirs['root'], 'metadata.json'), 'w', encoding='utf-8') as f:
-                                        json.dump(metadata, f, indent=2, ensure_ascii=False)
+                                    dump_json(metadata, os.path.join(dirs['root'], 'metadata.json'))
                                     # Generate HTML after metadata is created
+                                    finalize_trajectory_ocr(dirs)
                                     generate_trajectory_html(dirs, metadata)
                                     print("✅ Task completed on retry, metadata saved.")
                                     should_continue = False
@@ -943,9 +1228,9 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                                 )
                                 if gpt_resp and "output" in gpt_resp:
                                     metadata["gpt_output"] = gpt_resp["output"]
-                                with open(os.path.join(dirs['root'], 'metadata.json'), 'w', encoding='utf-8') as f:
-                                    json.dump(metadata, f, indent=2, ensure_ascii=False)
+                                dump_json(metadata, os.path.join(dirs['root'], 'metadata.json'))
                                 # Generate HTML after metadata is created
+                                finalize_trajectory_ocr(dirs)
                                 generate_trajectory_html(dirs, metadata)
                                 
                                 # Mark instruction as failed in progress tracker
@@ -955,14 +1240,27 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                                 break
                                         
                     if success:
-                        page.wait_for_timeout(2000)
+                        # OCR the post-action frame in the background while the page settles;
+                        # if the next capture is byte-identical, it is served from ocr_cache.
+                        # The frame may still be transient, so it stays out of the persistent cache.
+                        try:
+                            ocr_prefetch = io_executor.submit(
+                                get_ocr_element_data_cached,
+                                page.screenshot(),
+                                os.path.join(dirs['images'], f"screenshot_{step_idx+2:03d}.png"),
+                                ocr_cache,
+                                persist=False
+                            )
+                        except Exception as e:
+                            print(f"⚠️ Skipping speculative OCR: {e}")
+                        # Let the page settle, returning as soon as the network is idle
+                        try:
+                            page.wait_for_load_state("networkidle", timeout=2000)
+                        except TimeoutError:
+                            pass
                     else:
-                        # If the step failed, remove both screenshot and axtree files
-                        if os.path.exists(screenshot):
-                            os.remove(screenshot)
-                        if os.path.exists(axtree_file):
-                            os.remove(axtree_file)
-                            break
+                        # The failed step's capture was never written, so there is nothing to clean up
+                        break
 
                     # Prepare user message content
                     user_message_file = os.path.join(dirs['user_message'], f"user_message_{step_idx+1:03d}.txt")
@@ -972,24 +1270,39 @@ def generate_trajectory_loop(user_data_dir, chrome_path, phase, start_idx, end_i
                         execution_history=execution_history,
                         page=page,
                         tree=tree,
-                        failed_codes=failed_codes if 'failed_codes' in locals() else None
+                        failed_codes=failed_codes if 'failed_codes' in locals() else None,
+                        previous_actions=previous_actions
                     )
 
                 # Don't close the page here, just continue to next instruction
                 
         finally:
+            io_executor.shutdown(wait=True)
+            browser.remove_listener("page", record_opened_page)
             # Close page and browser at the very end
             if MODE == 1:
                 input("🔚 Press Enter to continue...")
             page.close()
-            browser.close()
+            if owns_browser:
+                browser.close()
+
+
+class ProgressManager(BaseManager):
+    """Serves a single ProgressTracker to every account process."""
+
+
+ProgressManager.register("ProgressTracker", ProgressTracker)
+
 
 def run_for_account(account, chrome_path, phase, progress_tracker):
+    # Load and warm up this process's OCR models while the browser launches and logs in
+    threading.Thread(target=get_ocr_worker, daemon=True).start()
+    
     user_data_dir = os.path.join(BROWSER_SESSIONS_DIR, account["user_data_dir"])
     # Only create the directory if it doesn't exist
     if not os.path.exists(user_data_dir):
         os.makedirs(user_data_dir, exist_ok=True)
-        
+    
     generate_trajectory_loop(
         user_data_dir=user_data_dir,
         chrome_path=chrome_path,
@@ -1003,29 +1316,37 @@ def run_for_account(account, chrome_path, phase, progress_tracker):
 
 def main():
     chrome_exec = os.getenv("CHROME_EXECUTABLE_PATH")
+    ctx = mp.get_context("spawn")  # Never fork a process that is running Playwright threads
     
-    # Initialize progress tracker
-    progress_tracker = ProgressTracker(RESULTS_DIR)
-    
-    # Calculate total instructions for progress tracking
-    instructions_per_persona = PHASE2_INSTRUCTIONS_PER_PERSONA if PHASE == 2 else PHASE1_INSTRUCTIONS_PER_PERSONA
-    total_instructions = TOTAL_PERSONAS * instructions_per_persona
-    
-    # Setup progress tracking for all accounts
-    progress_tracker.setup_accounts(ACCOUNTS, total_instructions)
-    print("📊 Progress tracking initialized!")
-    
-    with ThreadPoolExecutor(max_workers=len(ACCOUNTS)) as executor:
-        futures = [
-            executor.submit(run_for_account, account, chrome_exec, PHASE, progress_tracker)
-            for account in ACCOUNTS
-        ]
-        for future in futures:
-            future.result()  # Wait for all to finish
-    
-    # Print final progress summary
-    progress_tracker.print_progress_summary()
-
+    # The tracker lives in a manager process so every account process updates the same state
+    with ProgressManager(ctx=ctx) as manager:
+        progress_tracker = manager.ProgressTracker(RESULTS_DIR)
+        
+        # Calculate total instructions for progress tracking
+        instructions_per_persona = PHASE2_INSTRUCTIONS_PER_PERSONA if PHASE == 2 else PHASE1_INSTRUCTIONS_PER_PERSONA
+        total_instructions = TOTAL_PERSONAS * instructions_per_persona
+        
+        # Setup progress tracking for all accounts
+        progress_tracker.setup_accounts(ACCOUNTS, total_instructions)
+        print("📊 Progress tracking initialized!")
+        
+        # One process per account so Playwright, image work and JSON handling never share a GIL.
+        # Interactive mode needs the terminal's stdin, which child processes do not get.
+        if MODE == 1:
+            executor = ThreadPoolExecutor(max_workers=len(ACCOUNTS))
+        else:
+            executor = ProcessPoolExecutor(max_workers=len(ACCOUNTS), mp_context=ctx)
+        
+        with executor:
+            futures = [
+                executor.submit(run_for_account, account, chrome_exec, PHASE, progress_tracker)
+                for account in ACCOUNTS
+            ]
+            for future in futures:
+                future.result()  # Wait for all to finish
+        
+        # Print final progress summary
+        progress_tracker.print_progress_summary()
 
 
 if __name__ == "__main__":
@@ -1,6 +1,9 @@
 # Initialize PaddleOCR instance
 from paddleocr import PaddleOCR
-import json
+import numpy as np
+import orjson
+
+MIN_CONFIDENCE = 0.6  # Detections scored below this are dropped
 
 ocr = PaddleOCR(
     use_doc_orientation_classify=False,
@@ -19,11 +22,11 @@ for res in result:
     # Debug: Check what attributes are available
     print(f"Available attributes: {dir(res)}")
     
-           # Create organized JSON structure
-           organized_data = {
-               "image_path": "letseego.png",  # Use the filename directly
-               "elements": []
-           }
+    # Create organized JSON structure
+    organized_data = {
+        "image_path": "letseego.png",  # Use the filename directly
+        "elements": []
+    }
     
     # Access the data from the result object
     # The data is stored in the result object's internal structure
@@ -31,35 +34,44 @@ for res in result:
     
     # Combine text and bounding boxes into individual objects
     texts = result_data['rec_texts']
-    boxes = result_data['rec_boxes'] 
-    scores = result_data['rec_scores']
+    boxes = np.asarray(result_data['rec_boxes'], dtype=np.int32).reshape(-1, 4)
+    scores = np.asarray(result_data['rec_scores'], dtype=np.float64).reshape(-1)
+    
+    # Drop low-confidence detections
+    keep = scores >= MIN_CONFIDENCE
+    texts = [text for text, kept in zip(texts, keep.tolist()) if kept]
+    boxes = boxes[keep]
+    scores = scores[keep]
+    
+    # Calculate click coordinates (center of bounding box) for all boxes at once
+    x1, y1, x2, y2 = boxes.T
+    click_x = (x1 + x2) // 2
+    click_y = (y1 + y2) // 2
     
-           for i, (text, box, score) in enumerate(zip(texts, boxes, scores)):
-               x1, y1, x2, y2 = int(box[0]), int(box[1]), int(box[2]), int(box[3])
-               
-               # Calculate click coordinates (center of bounding box)
-               click_x = (x1 + x2) // 2
-               click_y = (y1 + y2) // 2
-               
-               text_element = {
-                   "annotation_id": i,
-                   "text": text,
-                   "confidence": float(score),
-                   "bounding_box": {
-                       "x1": x1,
-                       "y1": y1,
-                       "x2": x2,
-                       "y2": y2
-                   },
-                   "click_coordinates": {
-                       "x": click_x,
-                       "y": click_y
-                   }
-               }
-               organized_data["elements"].append(text_element)
+    organized_data["elements"] = [
+        {
+            "annotation_id": i,
+            "text": text,
+            "confidence": score,
+            "bounding_box": {
+                "x1": bx1,
+                "y1": by1,
+                "x2": bx2,
+                "y2": by2
+            },
+            "click_coordinates": {
+                "x": cx,
+                "y": cy
+            }
+        }
+        for i, (text, score, bx1, by1, bx2, by2, cx, cy) in enumerate(zip(
+            texts, scores.tolist(), x1.tolist(), y1.tolist(), x2.tolist(), y2.tolist(),
+            click_x.tolist(), click_y.tolist()
+        ))
+    ]
     
     # Save organized JSON
-    with open("output/organized_ocr_results.json", "w", encoding="utf-8") as f:
-        json.dump(organized_data, f, indent=2, ensure_ascii=False)
+    with open("output/organized_ocr_results.json", "wb") as f:
+        f.write(orjson.dumps(organized_data, option=orjson.OPT_INDENT_2))
     
-    print(f"✅ Saved organized results with {len(organized_data['elements'])} text elements")
\ No newline at end of file
+    print(f"✅ Saved organized results with {len(organized_data['elements'])} text elements")
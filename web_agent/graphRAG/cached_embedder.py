@@ -0,0 +1,106 @@
+"""
+Cached OpenAI Embedder
+
+Wraps Graphiti's OpenAIEmbedder with an in-process LRU cache so repeated search
+queries are embedded once instead of on every Graphiti search call. Misses fall back
+to the SQLite disk cache, so new processes reuse embeddings from earlier runs.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import List, Tuple
+
+from graphiti_core.embedder.openai import OpenAIEmbedder
+
+from graphRAG.disk_cache import get_disk_cache
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))  # Embeddings kept in memory (LRU)
+
+# Shared by every embedder instance, since a new GraphRAG client is created per lookup
+_embedding_cache: "OrderedDict[bytes, List[float]]" = OrderedDict()
+_embedding_cache_lock = threading.Lock()
+
+
+class CachedOpenAIEmbedder(OpenAIEmbedder):
+    """OpenAIEmbedder that serves repeated texts from memory."""
+
+    def _cache_key(self, text: str) -> bytes:
+        return hashlib.sha256((self.config.embedding_model + "\0" + text).encode("utf-8")).digest()
+
+    def _get_cached(self, key: bytes):
+        with _embedding_cache_lock:
+            embedding = _embedding_cache.get(key)
+            if embedding is not None:
+                _embedding_cache.move_to_end(key)
+                return embedding
+
+        disk_cache = get_disk_cache()
+        if disk_cache is None:
+            return None
+        try:
+            embedding = disk_cache.get_embedding(key)
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Disk embedding lookup failed: {e}")
+            return None
+        if embedding is not None:
+            self._remember(key, embedding)
+        return embedding
+
+    def _remember(self, key: bytes, embedding: List[float]) -> None:
+        with _embedding_cache_lock:
+            _embedding_cache[key] = embedding
+            _embedding_cache.move_to_end(key)
+            while len(_embedding_cache) > EMBEDDING_CACHE_SIZE:
+                _embedding_cache.popitem(last=False)
+
+    def _store(self, items: List[Tuple[bytes, List[float]]]) -> None:
+        """Cache fresh embeddings in memory and on disk."""
+        for key, embedding in items:
+            self._remember(key, embedding)
+        disk_cache = get_disk_cache()
+        if disk_cache is not None:
+            try:
+                disk_cache.put_embeddings(items)
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Disk embedding store failed: {e}")
+
+    async def create(self, input_data) -> List[float]:
+        """Embed a single text, reusing a cached embedding when available."""
+        # Graphiti's search passes the query as a one-element list
+        text = input_data
+        if isinstance(input_data, list) and len(input_data) == 1 and isinstance(input_data[0], str):
+            text = input_data[0]
+        # Token inputs are passed straight through
+        if not isinstance(text, str):
+            return await super().create(input_data)
+
+        key = self._cache_key(text)
+        embedding = self._get_cached(key)
+        if embedding is None:
+            embedding = await super().create(input_data)
+            self._store([(key, embedding)])
+        return embedding
+
+    async def create_batch(self, input_data_list: List[str]) -> List[List[float]]:
+        """Embed a batch of texts, only sending the uncached ones to OpenAI."""
+        keys = [self._cache_key(text) for text in input_data_list]
+        embeddings = [self._get_cached(key) for key in keys]
+
+        # Each distinct uncached text is embedded once, even if it repeats in the batch
+        missing = {}
+        for i, embedding in enumerate(embeddings):
+            if embedding is None:
+                missing.setdefault(keys[i], []).append(i)
+        if missing:
+            fresh = await super().create_batch([input_data_list[indexes[0]] for indexes in missing.values()])
+            for indexes, embedding in zip(missing.values(), fresh):
+                for i in indexes:
+                    embeddings[i] = embedding
+            self._store(list(zip(missing, fresh)))
+        return embeddings
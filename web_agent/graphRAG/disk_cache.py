@@ -0,0 +1,123 @@
+"""
+Persistent GraphRAG caches.
+Embeddings and LLM-derived task types are kept in SQLite next to the in-memory LRU
+caches, so a fresh process (e.g. a recycled worker) reuses earlier API results
+instead of starting cold.
+"""
+
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Directory holding the cache database; set it to an empty value to disable the disk cache
+GRAPHRAG_CACHE_DIR = os.getenv("GRAPHRAG_CACHE_DIR", os.path.join(tempfile.gettempdir(), "graphrag_cache"))
+DISK_CACHE_MAX_ENTRIES = int(os.getenv("GRAPHRAG_DISK_CACHE_MAX_ENTRIES", "200000"))  # Rows kept per table
+
+
+class GraphRAGDiskCache:
+    def __init__(self, db_path: str, max_entries: int = DISK_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()  # One connection shared by every client in the process
+        # Several worker processes may share the file; wait for their writes instead of failing
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        # Embeddings are stored as raw float32 bytes
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings "
+            "(key BLOB PRIMARY KEY, vector BLOB NOT NULL, accessed REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS embeddings_accessed ON embeddings (accessed)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS task_types "
+            "(key TEXT PRIMARY KEY, task_type TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS task_types_expires_at ON task_types (expires_at)")
+        self.conn.commit()
+
+    def get_embedding(self, key: bytes) -> Optional[List[float]]:
+        """Return a stored embedding, or None on a miss."""
+        with self.lock:
+            row = self.conn.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            # Refresh the access time so eviction is least-recently-used
+            self.conn.execute("UPDATE embeddings SET accessed = ? WHERE key = ?", (time.time(), key))
+            self.conn.commit()
+        return np.frombuffer(row[0], dtype=np.float32).tolist()
+
+    def put_embeddings(self, items: Iterable[Tuple[bytes, List[float]]]) -> None:
+        """Store (key, embedding) pairs and evict the oldest entries past the size cap."""
+        now = time.time()
+        rows = [(key, np.asarray(embedding, dtype=np.float32).tobytes(), now) for key, embedding in items]
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, accessed) VALUES (?, ?, ?)", rows
+            )
+            self.conn.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self.conn.commit()
+
+    def get_task_type(self, key: str) -> Optional[Tuple[str, float]]:
+        """Return a stored (task_type, expires_at) pair that has not expired, or None."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT task_type, expires_at FROM task_types WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[1] < time.time():
+                self.conn.execute("DELETE FROM task_types WHERE key = ?", (key,))
+                self.conn.commit()
+                return None
+        return row
+
+    def put_task_type(self, key: str, task_type: str, expires_at: float) -> None:
+        """Store a task type, dropping expired rows and the soonest-expiring past the size cap."""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO task_types (key, task_type, expires_at) VALUES (?, ?, ?)",
+                (key, task_type, expires_at)
+            )
+            self.conn.execute("DELETE FROM task_types WHERE expires_at < ?", (time.time(),))
+            self.conn.execute(
+                "DELETE FROM task_types WHERE key IN "
+                "(SELECT key FROM task_types ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self.conn.commit()
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+
+_disk_cache: Optional[GraphRAGDiskCache] = None
+_disk_cache_opened = False
+_disk_cache_lock = threading.Lock()
+
+
+def get_disk_cache() -> Optional[GraphRAGDiskCache]:
+    """Return the process-wide disk cache, opening it on first use; None when disabled or unavailable."""
+    global _disk_cache, _disk_cache_opened
+    if _disk_cache_opened:
+        return _disk_cache
+    with _disk_cache_lock:
+        if not _disk_cache_opened:
+            if GRAPHRAG_CACHE_DIR:
+                try:
+                    os.makedirs(GRAPHRAG_CACHE_DIR, exist_ok=True)
+                    _disk_cache = GraphRAGDiskCache(os.path.join(GRAPHRAG_CACHE_DIR, "graphrag_cache.sqlite3"))
+                except (OSError, sqlite3.Error) as e:
+                    logger.warning(f"⚠️ GraphRAG disk cache unavailable, using memory only: {e}")
+            _disk_cache_opened = True
+    return _disk_cache
@@ -6,31 +6,172 @@ Uses Graphiti for trajectory search and context retrieval.
 """
 
 import os
+import asyncio
+import io
 import logging
+import hashlib
+import heapq
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from itertools import chain
 from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit
 import sys
 import os
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.knowledge_base_client import KnowledgeBaseClient
+from graphRAG.disk_cache import get_disk_cache
+import orjson
 
 logger = logging.getLogger(__name__)
 
 
+class _ContextTruncated(Exception):
+    """Raised internally when formatted context reaches its length budget."""
+
+
+# One context entry per result; the trailing newline leaves a blank line between entries
+_TPL_WITH_CODES = "{i}. Instruction: {goal}\nSteps: {steps}\nCodes: {codes}\n"
+_TPL_NO_CODES = "{i}. Instruction: {goal}\nSteps: {steps}\n"
+
+
+def _compact_json(items, budget: int) -> str:
+    """
+    Serialize steps/codes as compact JSON. Every list item takes at least two characters,
+    so items past the first budget + 1 could only land in truncated-away text and are skipped.
+    """
+    if isinstance(items, list) and len(items) > budget + 1:
+        items = items[:budget + 1]
+    return orjson.dumps(items, default=str).decode("utf-8")
+
+
+def _relevance_score(result: dict) -> float:
+    """Ranking key; results without a score rank last."""
+    return result.get("relevance_score", 0.0)
+
+
+# Verbose per-call diagnostics (search progress, ingestion entity dumps)
+DEBUG_GRAPHRAG = os.getenv("DEBUG_GRAPHRAG") == "1"
+# Opt-in: search the query and its task type with one Graphiti query (RRF fuses them)
+# instead of the direct and task type layers; results are not split by layer
+FUSED_SEARCH = os.getenv("GRAPHRAG_FUSED_SEARCH", "0") == "1"
+_QUOTES_RE = re.compile(r"[\"']")  # Quotes stripped from LLM task types
+TRAJECTORY_LABELS = frozenset({"Trajectory"})  # Node labels that mark a trajectory
+
+# Search tuning for the trajectory corpus; unset values keep the recipe defaults
+SEARCH_LIMIT = os.getenv("GRAPHRAG_SEARCH_LIMIT")  # Candidates returned per search
+SEARCH_SIM_MIN_SCORE = os.getenv("GRAPHRAG_SIM_MIN_SCORE")  # Minimum cosine similarity for vector matches
+
+
+def _build_search_config():
+    """Build the Graphiti search config once, applying the env overrides."""
+    try:
+        from graphiti_core.search.search_config_recipes import NODE_HYBRID_SEARCH_RRF
+    except ImportError:
+        # Fallback to default search if enhanced config not available
+        logger.warning("⚠️ Enhanced search config not available, using default")
+        return None
+    if SEARCH_LIMIT is None and SEARCH_SIM_MIN_SCORE is None:
+        return NODE_HYBRID_SEARCH_RRF
+    
+    # Tune a copy; the recipe constant is shared with the rest of Graphiti
+    config = NODE_HYBRID_SEARCH_RRF.model_copy(deep=True)
+    if SEARCH_LIMIT is not None:
+        config.limit = int(SEARCH_LIMIT)
+    if SEARCH_SIM_MIN_SCORE is not None and config.node_config is not None:
+        config.node_config.sim_min_score = float(SEARCH_SIM_MIN_SCORE)
+    return config
+
+
+_SEARCH_CONFIG = _build_search_config()  # Shared by every search call
+
+TASK_TYPE_CACHE_SIZE = int(os.getenv("TASK_TYPE_CACHE_SIZE", "1024"))  # In-memory task types kept (LRU)
+TASK_TYPE_CACHE_TTL = int(os.getenv("TASK_TYPE_CACHE_TTL", str(7 * 24 * 3600)))  # Seconds a derived task type stays valid
+
+# LLM-derived task types keyed by normalized query. Module level because
+# get_trajectory_context() creates a new client for every lookup; backed by the
+# disk cache so new processes start warm.
+_task_type_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_task_type_cache_lock = threading.Lock()
+
+
+def _normalize_query(query: str) -> str:
+    """Normalize a query so trivially different spellings share a cache entry."""
+    return " ".join(query.lower().split())
+
+
+def _get_cached_task_type(key: str) -> Optional[str]:
+    """Return a cached task type that has not expired, checking memory then disk, or None."""
+    with _task_type_cache_lock:
+        entry = _task_type_cache.get(key)
+        if entry is not None:
+            task_type, expires_at = entry
+            if expires_at >= time.time():
+                _task_type_cache.move_to_end(key)
+                return task_type
+            del _task_type_cache[key]
+    
+    disk_cache = get_disk_cache()
+    if disk_cache is None:
+        return None
+    try:
+        entry = disk_cache.get_task_type(key)
+    except sqlite3.Error as e:
+        logger.warning(f"⚠️ Disk task type lookup failed: {e}")
+        return None
+    if entry is None:
+        return None
+    _remember_task_type(key, entry[0], entry[1])
+    return entry[0]
+
+
+def _remember_task_type(key: str, task_type: str, expires_at: float) -> None:
+    """Store a task type in memory, evicting the least recently used entries past the size cap."""
+    with _task_type_cache_lock:
+        _task_type_cache[key] = (task_type, expires_at)
+        _task_type_cache.move_to_end(key)
+        while len(_task_type_cache) > TASK_TYPE_CACHE_SIZE:
+            _task_type_cache.popitem(last=False)
+
+
+def _cache_task_type(key: str, task_type: str) -> None:
+    """Store a task type in memory and on disk."""
+    expires_at = time.time() + TASK_TYPE_CACHE_TTL
+    _remember_task_type(key, task_type, expires_at)
+    disk_cache = get_disk_cache()
+    if disk_cache is not None:
+        try:
+            disk_cache.put_task_type(key, task_type, expires_at)
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Disk task type store failed: {e}")
+
+
 class GraphRAGClient(KnowledgeBaseClient):
     """GraphRAG-specific implementation of the knowledge base client using Graphiti."""
     
     def __init__(self):
         self.available = False
         self.graphiti = None
+        self._ready = False  # available and graphiti set; read directly on hot paths
+        self.llm_client = None
+        self.redis = None
+        self._debug_tasks = set()  # Background DEBUG_GRAPHRAG ingest dumps still running
         self._initialize_graphiti()
     
     def _initialize_graphiti(self):
         """Initialize Graphiti connection and configuration."""
         try:
             from graphiti_core.graphiti import Graphiti
-            from graphiti_core.embedder.openai import OpenAIEmbedder, OpenAIEmbedderConfig
+            from graphiti_core.embedder.openai import OpenAIEmbedderConfig
+            from graphRAG.cached_embedder import CachedOpenAIEmbedder
             from graphiti_core.driver.neo4j_driver import Neo4jDriver
+            from graphiti_core.llm_client.openai_client import OpenAIClient
+            from graphiti_core.llm_client.config import LLMConfig
             
             # Configuration
             self.uri = os.getenv("NEO4J_URI")
@@ -49,7 +190,8 @@ class GraphRAGClient(KnowledgeBaseClient):
                 api_key=self.api_key,
                 embedding_model="text-embedding-3-small"
             )
-            embedder = OpenAIEmbedder(config=embedder_config)
+            # Repeated queries (and the task type searches) reuse cached embeddings
+            embedder = CachedOpenAIEmbedder(config=embedder_config)
             neo4j_driver = Neo4jDriver(
                 uri=self.uri,
                 user=self.user,
@@ -61,7 +203,20 @@ class GraphRAGClient(KnowledgeBaseClient):
                 embedder=embedder
             )
             
+            # LLM client for task type derivation, built once instead of per query
+            self.llm_client = OpenAIClient(config=LLMConfig(api_key=self.api_key))
+            
+            # Optional shared task type cache so separate runs reuse each other's LLM results
+            redis_url = os.getenv("REDIS_URL")
+            if redis_url:
+                try:
+                    import redis.asyncio as redis_asyncio
+                    self.redis = redis_asyncio.from_url(redis_url)
+                except ImportError:
+                    logger.warning("⚠️ redis not installed, task type cache is in-memory only")
+            
             self.available = True
+            self._ready = self.graphiti is not None
             logger.info("✅ GraphRAG client (Graphiti) initialized successfully")
             
         except ImportError:
@@ -69,54 +224,84 @@ class GraphRAGClient(KnowledgeBaseClient):
         except Exception as e:
             logger.error(f"❌ Error initializing GraphRAG client: {e}")
     
+    async def close(self) -> None:
+        """Close the Redis task type cache connections; the client reconnects on its next lookup."""
+        if self.redis is None:
+            return
+        try:
+            # redis-py < 5 only has close()
+            await (self.redis.aclose() if hasattr(self.redis, "aclose") else self.redis.close())
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to close Redis connection: {e}")
+    
     async def is_available(self) -> bool:
         """Check if GraphRAG is available and configured."""
         return self.available and self.graphiti is not None
     
     async def search_trajectories(self, query: str, max_results: int = 3, max_context_length: int = 3000) -> str:
         """Multi-layer search for relevant trajectories using GraphRAG (Graphiti)."""
-        if not await self.is_available():
-            print("❌ GraphRAG client not available")
+        if not self._ready:
+            logger.error("❌ GraphRAG client not available")
             return ""
         
         try:
-            print(f"🔍 Starting multi-layer search for query: '{query}'")
-            
-            # Layer 1: Direct Trajectory Search
-            print("📊 Layer 1: Performing direct trajectory search...")
-            direct_results = await self._layer1_direct_search(query, 5)
-            print(f"✅ Layer 1 found {len(direct_results)} direct matches:")
-            for i, result in enumerate(direct_results, 1):
-                goal = result.get('goal', 'Unknown')
-                print(f"   {i}. {goal}")
-            
-            # Layer 2: Task Type Search
-            print("📊 Layer 2: Performing task type search...")
-            task_type_results = await self._layer2_task_type_search(query, 5)
-            print(f"✅ Layer 2 found {len(task_type_results)} task type matches:")
-            for i, result in enumerate(task_type_results, 1):
-                goal = result.get('goal', 'Unknown')
-                print(f"   {i}. {goal}")
+            logger.debug("🔍 Starting multi-layer search for query: '%s'", query)
+            
+            # Derived once and shared by both layers, so a failed derivation is not retried mid-lookup
+            task_type = await self._derive_task_type_with_llm(query)
+            
+            if FUSED_SEARCH:
+                # Layers 1 and 2 collapsed into a single Graphiti round-trip
+                logger.debug("📊 Layers 1+2: Performing fused query + task type search...")
+                direct_results = await self._fused_search(query, task_type, 10)
+                task_type_results = []
+            else:
+                # Embed the query and its task type in one request; both searches then hit the embedding cache
+                await self._embed_batch([query, task_type] if task_type else [query])
+                
+                # Layer 1 (direct trajectory search) and Layer 2 (task type search) are independent,
+                # so run them concurrently
+                logger.debug("📊 Layers 1 and 2: Performing direct and task type searches...")
+                direct_results, task_type_results = await asyncio.gather(
+                    self._layer1_direct_search(query, 5),
+                    self._layer2_task_type_search(task_type, 5),
+                    return_exceptions=True
+                )
+                if isinstance(direct_results, BaseException):
+                    logger.error(f"❌ Error in Layer 1 search: {direct_results}")
+                    direct_results = []
+                if isinstance(task_type_results, BaseException):
+                    logger.error(f"❌ Error in Layer 2 search: {task_type_results}")
+                    task_type_results = []
+            
+            if DEBUG_GRAPHRAG:
+                logger.debug("✅ Layer 1 found %d direct matches:", len(direct_results))
+                for i, result in enumerate(direct_results, 1):
+                    logger.debug("   %d. %s", i, result.get('goal', 'Unknown'))
+                logger.debug("✅ Layer 2 found %d task type matches:", len(task_type_results))
+                for i, result in enumerate(task_type_results, 1):
+                    logger.debug("   %d. %s", i, result.get('goal', 'Unknown'))
             
             # Combine and rank results
-            print("📊 Combining and ranking results...")
             combined_results = self._combine_and_rank_results(direct_results, task_type_results, max_results)
-            print(f"✅ Combined results: {len(combined_results)} total trajectories")
+            logger.debug("✅ Combined results: %d total trajectories", len(combined_results))
             
             if not combined_results:
-                print("ℹ️ No relevant past trajectories found")
+                logger.info("ℹ️ No relevant past trajectories found")
                 return ""
             
             # Format context
-            print("📊 Formatting context...")
             context = self._format_enhanced_context(combined_results, max_context_length)
             
-            print(f"✅ Multi-layer search completed successfully")
+            logger.debug("✅ Multi-layer search completed successfully")
             return context
             
         except Exception as e:
-            print(f"❌ Error in multi-layer search: {e}")
+            logger.error(f"❌ Error in multi-layer search: {e}")
             return ""
+        finally:
+            # Callers run each lookup in its own event loop; drop the Redis connections opened on this one
+            await self.close()
     
     async def _layer1_direct_search(self, query: str, max_results: int) -> list:
         """Layer 1: Direct trajectory search using semantic similarity."""
@@ -128,45 +313,45 @@ class GraphRAGClient(KnowledgeBaseClient):
                 config=self._get_enhanced_search_config()
             )
             
-            # Filter for trajectory nodes and track their group
-            trajectory_nodes = []
-            for node in results.nodes:
-                if getattr(node, "labels", None) and "Trajectory" in node.labels:
-                    # Determine which group this node belongs to
-                    group_id = getattr(node, "group_id", "unknown")
-                    trajectory_nodes.append((node, group_id))
-            
-            # Extract trajectory data
-            direct_results = []
-            for node, group_id in trajectory_nodes[:max_results]:
-                trajectory_data = self._extract_trajectory_data(node)
-                if trajectory_data:
-                    trajectory_data["search_layer"] = "direct"
-                    trajectory_data["relevance_score"] = getattr(node, "score", 0.5)
-                    trajectory_data["group_id"] = group_id  # Track which group it came from
-                    direct_results.append(trajectory_data)
-            
-            return direct_results
+            # Filter for trajectory nodes and extract their data
+            return self._collect_trajectories(results.nodes, max_results, search_layer="direct")
             
         except Exception as e:
             logger.error(f"❌ Error in Layer 1 search: {e}")
             return []
     
-    async def _layer2_task_type_search(self, query: str, max_results: int) -> list:
-        """Layer 2: Task type search using LLM-derived task type."""
+    async def _embed_batch(self, texts: list) -> None:
+        """Embed several search texts with one API call so Graphiti's searches find them cached."""
         try:
-            # Step 1: Use LLM to derive task type from query
-            task_type = await self._derive_task_type_with_llm(query)
-            if not task_type:
-                logger.info("ℹ️ Could not derive task type from LLM, skipping Layer 2 search")
-                return []
-            
-            logger.info(f"🔍 LLM derived task type: {task_type}")
-            
-            # Step 2: Search for trajectories with this task type
+            # Graphiti embeds search queries with newlines replaced, so the cache keys must match
+            await self.graphiti.embedder.create_batch([text.replace("\n", " ") for text in texts])
+        except Exception as e:
+            logger.warning(f"⚠️ Batch embedding failed, searches will embed individually: {e}")
+    
+    async def _fused_search(self, query: str, task_type: Optional[str], max_results: int) -> list:
+        """Layers 1 and 2 in one Graphiti search over the query plus its LLM-derived task type."""
+        if not task_type:
+            logger.info("ℹ️ Could not derive task type from LLM, using direct search only")
+            return await self._layer1_direct_search(query, max_results)
+        
+        # The hybrid RRF recipe ranks nodes matching either part, so no client-side merge is needed
+        results = await self._layer1_direct_search(f"{query}\n{task_type}", max_results)
+        for trajectory in results:
+            trajectory["search_layer"] = "fused"
+            trajectory["derived_task_type"] = task_type
+        return results
+    
+    async def _layer2_task_type_search(self, task_type: Optional[str], max_results: int) -> list:
+        """Layer 2: Task type search using the task type already derived for the query."""
+        if not task_type:
+            logger.info("ℹ️ Could not derive task type from LLM, skipping Layer 2 search")
+            return []
+        
+        try:
+            # Step 1: Search for trajectories with this task type
             task_results = await self._find_trajectories_by_task_type(task_type, max_results)
             
-            # Step 3: Format results
+            # Step 2: Format results
             hierarchy_results = []
             for trajectory in task_results:
                 trajectory["search_layer"] = "task_type"
@@ -182,21 +367,31 @@ class GraphRAGClient(KnowledgeBaseClient):
             return []
     
     async def _derive_task_type_with_llm(self, query: str) -> str:
-        """Use LLM to derive task type from query."""
+        """Use LLM to derive task type from query, checking the memory, disk and Redis caches first."""
         try:
-            # Import LLM client
-            from graphiti_core.llm_client.openai_client import OpenAIClient
-            
-            # Initialize LLM client
-            api_key = os.getenv("OPENAI_API_KEY")
-            if not api_key:
+            cache_key = _normalize_query(query)
+            task_type = _get_cached_task_type(cache_key)
+            if task_type is not None:
+                logger.info(f"♻️ Cached task type: '{task_type}' for query: '{query}'")
+                return task_type
+            
+            redis_key = "task_type:" + hashlib.sha256(cache_key.encode("utf-8")).hexdigest()
+            if self.redis is not None:
+                try:
+                    cached = await self.redis.get(redis_key)
+                except Exception as e:
+                    logger.warning(f"⚠️ Redis task type lookup failed: {e}")
+                    cached = None
+                if cached is not None:
+                    task_type = cached.decode("utf-8")
+                    _cache_task_type(cache_key, task_type)
+                    logger.info(f"♻️ Cached task type (Redis): '{task_type}' for query: '{query}'")
+                    return task_type
+            
+            if self.llm_client is None:
                 logger.error("❌ OpenAI API key not found")
                 return None
             
-            from graphiti_core.llm_client.config import LLMConfig
-            llm_config = LLMConfig(api_key=api_key)
-            llm_client = OpenAIClient(config=llm_config)
-            
             # Create prompt for task type derivation
             prompt = f"""
             Analyze this web task query and derive a concise task type.
@@ -217,20 +412,22 @@ class GraphRAGClient(KnowledgeBaseClient):
             from graphiti_core.prompts.models import Message
             
             messages = [Message(role="user", content=prompt)]
-            response = await llm_client.generate_response(
+            response = await self.llm_client.generate_response(
                 messages=messages,
                 max_tokens=50
             )
             
             # Extract task type from response (based on ingest_string.py pattern)
-            if isinstance(response, dict) and "content" in response:
+            if isinstance(response, dict) and "task_type" in response:
+                # Graphiti already parsed the JSON reply
+                task_type = str(response["task_type"])
+            elif isinstance(response, dict) and "content" in response:
                 content = response["content"].strip()
                 # Try to parse as JSON first
                 try:
-                    import json
-                    json_response = json.loads(content)
-                    task_type = json_response.get("task_type", content)
-                except json.JSONDecodeError:
+                    json_response = orjson.loads(content)
+                    task_type = json_response.get("task_type", content) if isinstance(json_response, dict) else content
+                except orjson.JSONDecodeError:
                     # Fallback to direct content
                     task_type = content
             else:
@@ -238,13 +435,21 @@ class GraphRAGClient(KnowledgeBaseClient):
                 task_type = str(response).strip()
             
             # Clean up the response (remove quotes, extra text, etc.)
-            task_type = task_type.replace('"', '').replace("'", "").strip()
+            task_type = _QUOTES_RE.sub("", task_type).strip()
             
             # If response is too long, take first few words
-            if len(task_type.split()) > 4:
-                task_type = " ".join(task_type.split()[:4])
+            words = task_type.split()
+            if len(words) > 4:
+                task_type = " ".join(words[:4])
             
             logger.info(f"🔍 LLM derived task type: '{task_type}' from query: '{query}'")
+            if task_type:
+                _cache_task_type(cache_key, task_type)
+                if self.redis is not None:
+                    try:
+                        await self.redis.set(redis_key, task_type, ex=TASK_TYPE_CACHE_TTL)
+                    except Exception as e:
+                        logger.warning(f"⚠️ Redis task type store failed: {e}")
             return task_type
             
         except Exception as e:
@@ -261,48 +466,57 @@ class GraphRAGClient(KnowledgeBaseClient):
                 config=self._get_enhanced_search_config()
             )
             
-            # Filter for trajectory nodes and track their group
-            trajectory_nodes = []
-            for node in results.nodes:
-                if getattr(node, "labels", None) and "Trajectory" in node.labels:
-                    # Determine which group this node belongs to
-                    group_id = getattr(node, "group_id", "unknown")
-                    trajectory_nodes.append((node, group_id))
-            
-            # Extract trajectory data
-            trajectories = []
-            for node, group_id in trajectory_nodes[:max_results]:
-                trajectory_data = self._extract_trajectory_data(node)
-                if trajectory_data:
-                    trajectory_data["group_id"] = group_id  # Track which group it came from
-                    trajectories.append(trajectory_data)
-            
-            return trajectories
+            # Filter for trajectory nodes and extract their data
+            return self._collect_trajectories(results.nodes, max_results)
             
         except Exception as e:
             logger.error(f"❌ Error finding trajectories by task type: {e}")
             return []
     
+    def _collect_trajectories(self, nodes, max_results: int, search_layer: Optional[str] = None) -> list:
+        """
+        Extract the first max_results trajectories from Graphiti search nodes in one pass.
+        Direct-layer results also record their search layer and relevance score.
+        """
+        _getattr = getattr  # Local bindings for the per-node lookups
+        no_trajectory_label = TRAJECTORY_LABELS.isdisjoint
+        trajectories = []
+        if max_results <= 0:
+            return trajectories
+        for node in nodes:
+            if no_trajectory_label(_getattr(node, "labels", None) or ()):
+                continue
+            trajectory_data = self._extract_trajectory_data(node)
+            if not trajectory_data:
+                continue
+            if search_layer is not None:
+                trajectory_data["search_layer"] = search_layer
+                trajectory_data["relevance_score"] = _getattr(node, "score", 0.5)
+            trajectory_data["group_id"] = _getattr(node, "group_id", "unknown")  # Track which group it came from
+            trajectories.append(trajectory_data)
+            # Stop scanning as soon as enough trajectories are found
+            if len(trajectories) >= max_results:
+                break
+        return trajectories
+    
     def _combine_and_rank_results(self, direct_results: list, task_type_results: list, max_results: int) -> list:
         """Combine and rank results from both search layers."""
         try:
-            # Combine all results
-            all_results = direct_results + task_type_results
-            
-            # Remove duplicates based on trajectory goal
-            seen_goals = set()
-            unique_results = []
-            
-            for result in all_results:
+            # Remove duplicates based on trajectory goal, ignoring case, surrounding whitespace
+            # and trailing punctuation; goals are compared by a short digest and the
+            # higher-scoring copy of a duplicate is kept
+            best = {}
+            for result in chain(direct_results, task_type_results):
                 goal = result.get("goal", "")
-                if goal and goal not in seen_goals:
-                    seen_goals.add(goal)
-                    unique_results.append(result)
-            
-            # Sort by relevance score
-            unique_results.sort(key=lambda x: x.get("relevance_score", 0), reverse=True)
+                if not goal:
+                    continue
+                goal_key = hashlib.blake2b(goal.strip().rstrip(".!?").lower().encode("utf-8"), digest_size=8).digest()
+                current = best.get(goal_key)
+                if current is None or _relevance_score(result) > _relevance_score(current):
+                    best[goal_key] = result
             
-            return unique_results[:max_results]
+            # Top results by relevance score, without sorting the whole set
+            return heapq.nlargest(max_results, best.values(), key=_relevance_score)
             
         except Exception as e:
             logger.error(f"❌ Error combining and ranking results: {e}")
@@ -340,40 +554,51 @@ class GraphRAGClient(KnowledgeBaseClient):
             return None
     
     def _format_enhanced_context(self, results: list, max_context_length: int) -> str:
-        """Format search results into enhanced context."""
+        """
+        Format search results into enhanced context.
+        Lines are streamed into a buffer that stops at max_context_length, so results past
+        the budget are never formatted.
+        """
         try:
-            context_parts = ["Previous trajectories and solution steps that worked:"]
-            
-            # Combine all results and number them sequentially
-            all_results = []
-            for result in results:
-                all_results.append(result)
-            
-            # Format all results in a simple numbered list
-            for i, result in enumerate(all_results, 1):
-                goal = result.get('goal', 'Unknown goal')
-                steps = result.get('steps', [])
-                codes = result.get('codes', [])
-                group_id = result.get("group_id", "unknown")
+            buffer = io.StringIO()
+            written = 0
+            
+            def emit(line: str) -> None:
+                nonlocal written
+                chunk = line if written == 0 else "\n" + line
+                if written + len(chunk) > max_context_length:
+                    # Keep exactly the prefix that truncating the full text would keep
+                    buffer.write(chunk[:max_context_length - written])
+                    raise _ContextTruncated
+                buffer.write(chunk)
+                written += len(chunk)
+            
+            try:
+                emit("Previous trajectories and solution steps that worked:")
                 
-                context_parts.append(f"{i}. Instruction: {goal}")
-                context_parts.append(f"Steps: {steps}")
-                
-                # Include codes for web_trajectories group, skip for interaction logs
-                if group_id != "web_interaction_logs" and codes:
-                    context_parts.append(f"Codes: {codes}")
+                # Format all results in a simple numbered list
+                for i, result in enumerate(results, 1):
+                    budget = max_context_length - written
+                    codes = result.get('codes', [])
+                    fields = {
+                        "i": i,
+                        "goal": result.get('goal', 'Unknown goal'),
+                        "steps": _compact_json(result.get('steps', []), budget)
+                    }
+                    
+                    # Include codes for web_trajectories group, skip for interaction logs
+                    if result.get("group_id", "unknown") != "web_interaction_logs" and codes:
+                        fields["codes"] = _compact_json(codes, budget)
+                        emit(_TPL_WITH_CODES.format_map(fields))
+                    else:
+                        emit(_TPL_NO_CODES.format_map(fields))
                 
-                context_parts.append("")
-            
-            context_parts.append("You can use these as reference to determine your next step.")
-            full_context = "\n".join(context_parts)
+                emit("You can use these as reference to determine your next step.")
+            except _ContextTruncated:
+                logger.warning(f"⚠️ Context exceeds limit ({max_context_length}). Truncating...")
+                return buffer.getvalue() + "\n... [CONTEXT TRUNCATED]"
             
-            # Truncate if too long
-            if len(full_context) > max_context_length:
-                logger.warning(f"⚠️ Context length ({len(full_context)}) exceeds limit ({max_context_length}). Truncating...")
-                full_context = full_context[:max_context_length] + "\n... [CONTEXT TRUNCATED]"
-            
-            return full_context
+            return buffer.getvalue()
             
         except Exception as e:
             logger.error(f"❌ Error formatting enhanced context: {e}")
@@ -384,13 +609,11 @@ class GraphRAGClient(KnowledgeBaseClient):
         if not url:
             return "Unknown Platform"
         
-        # Remove protocol and www
-        clean_url = url.replace("https://", "").replace("http://", "").replace("www.", "")
-        
-        # Extract domain and path
-        url_parts = clean_url.split("/")
-        domain = url_parts[0].lower()
-        path = "/".join(url_parts[1:]).lower() if len(url_parts) > 1 else ""
+        # Split once into host and path; schemeless URLs get a scheme so the host parses as netloc
+        parts = urlsplit(url if "://" in url else "http://" + url)
+        domain = parts.hostname or ""
+        domain = domain[4:] if domain.startswith("www.") else domain
+        path = parts.path.lstrip("/").lower()
         
         # For Google services, construct the full subdomain
         if domain == "google.com" and path:
@@ -404,17 +627,44 @@ class GraphRAGClient(KnowledgeBaseClient):
 
     def _get_enhanced_search_config(self):
         """Get enhanced search configuration for Graphiti."""
-        try:
-            from graphiti_core.search.search_config_recipes import NODE_HYBRID_SEARCH_RRF
-            return NODE_HYBRID_SEARCH_RRF
-        except ImportError:
-            # Fallback to default search if enhanced config not available
-            logger.warning("⚠️ Enhanced search config not available, using default")
-            return None
+        return _SEARCH_CONFIG
+    
+    def _log_ingest_debug(self, result) -> None:
+        """Print the node, duplicate and edge analysis of an add_episode_split() result."""
+        print(f"✅ add_episode_split() completed")
+        print(f"📊 Raw results: {len(result.nodes)} nodes, {len(result.edges)} edges")
+        
+        # Log detailed entity information
+        print(f"\n📋 DETAILED NODE ANALYSIS:")
+        entity_names = Counter()
+        for i, node in enumerate(result.nodes):
+            entity_names[node.name] += 1
+            print(f"  [{i+1}] Name: '{node.name}'")
+            print(f"      Labels: {node.labels}")
+            print(f"      Attributes: {list(node.attributes.keys()) if node.attributes else 'None'}")
+            print(f"      UUID: {node.uuid}")
+            print()
+        
+        # Check for duplicates
+        print(f"🔄 DUPLICATE ANALYSIS:")
+        duplicates_found = False
+        for name, count in entity_names.items():
+            if count > 1:
+                print(f"  ⚠️  '{name}' appears {count} times")
+                duplicates_found = True
+        
+        if not duplicates_found:
+            print(f"  ✅ No duplicate entity names found")
+        
+        print(f"🔗 EDGES ANALYSIS:")
+        for i, edge in enumerate(result.edges):
+            print(f"  [{i+1}] {edge.fact}")
+        
+        print(f"🏁 === END DEBUGGING ===\n")
     
     async def add_trajectory(self, trajectory_data: dict) -> bool:
         """Add a trajectory to the GraphRAG knowledge base using Graphiti."""
-        if not await self.is_available():
+        if not self._ready:
             logger.error("❌ GraphRAG client not available")
             return False
         
@@ -444,16 +694,16 @@ class GraphRAGClient(KnowledgeBaseClient):
                 has_errors = error_log_path.exists()
                 
                 # ==================== COMPREHENSIVE LOGGING ====================
-                print(f"\n🔍 === DEBUGGING ENTITY EXTRACTION ===")
-                print(f"📝 Episode text being sent to LLM:")
-                print("=" * 80)
-                print(episode_text)
-                print("=" * 80)
-                print(f"📏 Episode text length: {len(episode_text)} characters")
-                print(f"🏷️  Entity types provided: {list(WEB_TRAJECTORY_ENTITY_TYPES.keys())}")
+                if DEBUG_GRAPHRAG:
+                    print(f"\n🔍 === DEBUGGING ENTITY EXTRACTION ===")
+                    print(f"📝 Episode text being sent to LLM:")
+                    print("=" * 80)
+                    print(episode_text)
+                    print("=" * 80)
+                    print(f"📏 Episode text length: {len(episode_text)} characters")
+                    print(f"🏷️  Entity types provided: {list(WEB_TRAJECTORY_ENTITY_TYPES.keys())}")
                 
                 # Add to Graphiti using the new split extraction method
-                print(f"\n🚀 Calling graphiti.add_episode_split()...")
                 result = await self.graphiti.add_episode_split(
                     name=f"Trajectory: {trajectory_folder.name}",
                     episode_body=episode_text,
@@ -465,44 +715,12 @@ class GraphRAGClient(KnowledgeBaseClient):
                     mode="split"  # Use split mode for better accuracy
                 )
                 
-                print(f"✅ add_episode_split() completed")
-                print(f"📊 Raw results: {len(result.nodes)} nodes, {len(result.edges)} edges")
-                
-                # Log detailed entity information
-                print(f"\n📋 DETAILED NODE ANALYSIS:")
-                entity_names = {}
-                for i, node in enumerate(result.nodes):
-                    node_name = node.name
-                    if node_name in entity_names:
-                        entity_names[node_name] += 1
-                    else:
-                        entity_names[node_name] = 1
-                    
-                    print(f"  [{i+1}] Name: '{node_name}'")
-                    print(f"      Labels: {node.labels}")
-                    print(f"      Attributes: {list(node.attributes.keys()) if node.attributes else 'None'}")
-                    print(f"      UUID: {node.uuid}")
-                    print()
-                
-                # Check for duplicates
-                print(f"🔄 DUPLICATE ANALYSIS:")
-                duplicates_found = False
-                for name, count in entity_names.items():
-                    if count > 1:
-                        print(f"  ⚠️  '{name}' appears {count} times")
-                        duplicates_found = True
-                
-                if not duplicates_found:
-                    print(f"  ✅ No duplicate entity names found")
-                
-                print(f"🔗 EDGES ANALYSIS:")
-                for i, edge in enumerate(result.edges):
-                    print(f"  [{i+1}] {edge.fact}")
-                
-                print(f"🏁 === END DEBUGGING ===\n")
-                
-                # Summary (detailed analysis already shown above)
-                print(f"✅ SUMMARY: Created {len(result.nodes)} nodes and {len(result.edges)} edges for {trajectory_folder.name}")
+                if DEBUG_GRAPHRAG:
+                    # Print the node/edge analysis off the event loop; the task is kept referenced
+                    # until done, and asyncio.run() waits for the worker thread before exiting
+                    task = asyncio.create_task(asyncio.to_thread(self._log_ingest_debug, result))
+                    self._debug_tasks.add(task)
+                    task.add_done_callback(self._debug_tasks.discard)
                 
                 logger.info(f"✅ Successfully added trajectory to GraphRAG: {trajectory_folder.name}")
                 logger.info(f"📊 Created {len(result.nodes)} nodes and {len(result.edges)} edges")
@@ -0,0 +1,20 @@
+"""
+Playwright browser helpers for trajectory generation workers.
+"""
+
+from typing import Optional
+
+from playwright.sync_api import Playwright, BrowserContext
+
+
+def launch_browser(playwright: Playwright, user_data_dir: str, chrome_path: Optional[str]) -> BrowserContext:
+    """Launch a persistent Chromium context for a browser profile."""
+    return playwright.chromium.launch_persistent_context(
+        user_data_dir=user_data_dir,
+        executable_path=chrome_path,
+        headless=False,
+        args=[
+            "--disable-blink-features=AutomationControlled",
+            "--start-fullscreen"
+        ]
+    )
@@ -1,7 +1,7 @@
 import time
 import re
 from typing import Dict, Any, List, Optional, Tuple
-from PIL import Image, ImageDraw, ImageFont
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 
 
 def get_comprehensive_element_data(page, url: str = None) -> Dict[str, Any]:
@@ -444,6 +444,8 @@ def annotate_screenshot_with_bounding_boxes(screenshot_path: str, targeting_data
     Returns:
         Path to the annotated image
     """
+    from PIL import Image, ImageDraw, ImageFont
+    
     try:
         # Open the screenshot
         img = Image.open(screenshot_path)
@@ -662,7 +664,7 @@ def get_all_open_tabs(browser) -> list:
     return tabs
 
 
-def check_for_new_tabs(browser, previous_tab_count: int, previous_tab_urls: set) -> tuple[bool, list, int]:
+def check_for_new_tabs(browser, previous_tab_count: int, previous_tab_urls: set) -> tuple[bool, list, int, set]:
     """
     Check if new tabs were opened and return info about them.
     
@@ -672,7 +674,9 @@ def check_for_new_tabs(browser, previous_tab_count: int, previous_tab_urls: set)
         previous_tab_urls: Set of tab URLs from previous step
         
     Returns:
-        tuple: (has_new_tabs, new_tabs, current_tab_count)
+        tuple: (has_new_tabs, new_tabs, current_tab_count, current_tab_urls)
+        current_tab_urls comes from the same enumeration, so callers can use it as
+        the next step's previous_tab_urls without listing the tabs again.
     """
     current_tabs = get_all_open_tabs(browser)
     current_tab_count = len(current_tabs)
@@ -687,9 +691,9 @@ def check_for_new_tabs(browser, previous_tab_count: int, previous_tab_urls: set)
         print(f"🆕 New tabs detected! Previous: {previous_tab_count}, Current: {current_tab_count}")
         print(f"   New tabs: {[tab['domain'] for tab in new_tabs]}")
         
-        return True, new_tabs, current_tab_count
+        return True, new_tabs, current_tab_count, current_tab_urls
     else:
-        return False, [], current_tab_count
+        return False, [], current_tab_count, current_tab_urls
 
 
 def switch_to_new_tab(new_tabs: list, current_page) -> tuple[bool, object]:
@@ -713,16 +717,16 @@ def switch_to_new_tab(new_tabs: list, current_page) -> tuple[bool, object]:
         
         print(f"🔄 Switching to new tab: {new_tab['title']} ({new_tab['domain']})")
         
-        # Wait for the new tab to be ready
+        # Wait for the new tab to finish loading (8 seconds is an upper bound, not a floor)
         print("⏳ Waiting for new tab to stabilize...")
-        new_page.wait_for_timeout(3000)  # 3 second delay
+        try:
+            new_page.wait_for_load_state("load", timeout=8000)
+        except PlaywrightTimeoutError:
+            print("⚠️  New tab still loading after 8 seconds, continuing")
         
         # Bring the new tab to front
         new_page.bring_to_front()
         
-        # Wait a bit more after bringing to front
-        new_page.wait_for_timeout(2000)  # 2 second additional delay
-        
         # Verify the tab is accessible
         try:
             new_page.wait_for_selector('body', timeout=5000)
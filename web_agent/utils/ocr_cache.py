@@ -0,0 +1,58 @@
+"""
+Content-addressed OCR result cache.
+Maps a screenshot digest to the OCR element data produced for it. Results are kept in
+SQLite so they survive across episodes and pipeline runs.
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+import orjson
+
+
+class OCRCache:
+    def __init__(self, db_path: str, max_entries: int = 5000):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()  # Serializes the threads of this process on its connection
+        # Every account process opens the same file; wait out other writers instead of failing
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS ocr_cache "
+            "(hash TEXT PRIMARY KEY, json BLOB NOT NULL, accessed REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS ocr_cache_accessed ON ocr_cache (accessed)")
+        self.conn.commit()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return cached element data for a digest, or None on a miss."""
+        with self.lock:
+            row = self.conn.execute("SELECT json FROM ocr_cache WHERE hash = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            # Refresh the access time so eviction is least-recently-used
+            self.conn.execute("UPDATE ocr_cache SET accessed = ? WHERE hash = ?", (time.time(), key))
+            self.conn.commit()
+        return orjson.loads(row[0])
+
+    def put(self, key: str, elements_data: Dict) -> None:
+        """Store element data for a digest and evict the oldest entries past the size cap."""
+        payload = orjson.dumps(elements_data)
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO ocr_cache (hash, json, accessed) VALUES (?, ?, ?)",
+                (key, payload, time.time())
+            )
+            self.conn.execute(
+                "DELETE FROM ocr_cache WHERE hash IN "
+                "(SELECT hash FROM ocr_cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self.conn.commit()
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
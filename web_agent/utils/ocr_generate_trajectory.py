@@ -23,7 +23,8 @@ def chat_ai_playwright_code_ocr(
     url: str = "",
     error_log: str = "",
     trajectory_context: str = "",
-    session_dir: str = None
+    session_dir: str = None,
+    image_bytes: Optional[bytes] = None
 ) -> Optional[Dict]:
     """
     Generate Playwright code using OCR-based element detection.
@@ -39,6 +40,7 @@ def chat_ai_playwright_code_ocr(
         url: Current page URL
         error_log: Error log from previous attempts
         trajectory_context: Context from past trajectories
+        image_bytes: Screenshot contents, used instead of reading image_path when given
     
     Returns:
         Dictionary containing the GPT response with code, description, etc.
@@ -49,8 +51,10 @@ def chat_ai_playwright_code_ocr(
     
     # Encode image to base64
     try:
-        with open(image_path, "rb") as image_file:
-            base64_image = base64.b64encode(image_file.read()).decode('utf-8')
+        if image_bytes is None:
+            with open(image_path, "rb") as image_file:
+                image_bytes = image_file.read()
+        base64_image = base64.b64encode(image_bytes).decode('utf-8')
     except Exception as e:
         print(f"❌ Error encoding image: {e}")
         return None
@@ -0,0 +1,204 @@
+"""
+Persistent PaddleOCR worker process.
+Keeps the OCR models warm in a dedicated process and receives screenshots through
+shared memory, so frames are never pickled and inference never holds the GIL of
+the process driving Playwright and GPT calls.
+"""
+
+import multiprocessing as mp
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from tools.ocr_tool_paddle import get_ocr
+
+
+def _parse_result(result) -> Dict[str, Any]:
+    """Extract texts, boxes and scores from a PaddleOCR result object."""
+    result_data = result.res if hasattr(result, 'res') else result
+    return {
+        "rec_texts": list(result_data['rec_texts']),
+        "rec_boxes": np.asarray(result_data['rec_boxes']),
+        "rec_scores": np.asarray(result_data['rec_scores'], dtype=np.float64)
+    }
+
+
+def _worker_main(request_queue, response_queue) -> None:
+    """Serve batched OCR requests until a None sentinel is received."""
+    try:
+        ocr = get_ocr()
+        # Warm up once so kernel selection/compilation is not paid by the first real frame
+        list(ocr.predict(input=np.zeros((256, 256, 3), dtype=np.uint8)))
+    except Exception as e:
+        response_queue.put({"error": str(e)})
+        return
+    response_queue.put({"ready": True})
+
+    while True:
+        batch = request_queue.get()
+        if batch is None:
+            break
+
+        blocks = [shared_memory.SharedMemory(name=shm_name) for shm_name, _, _ in batch]
+        try:
+            images = [
+                np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+                for shm, (_, shape, dtype) in zip(blocks, batch)
+            ]
+            # One predict call for the whole batch amortizes per-call overhead
+            response_queue.put([_parse_result(result) for result in ocr.predict(input=images)])
+        except Exception as e:
+            response_queue.put([{"error": str(e)}] * len(batch))
+        finally:
+            # Drop the ndarray views before closing the mappings
+            images = None
+            for shm in blocks:
+                shm.close()
+
+
+class OCRWorker:
+    """
+    Client side of the OCR worker process. Thread-safe: concurrent predict() calls
+    from threads of the owning process are coalesced into batches by a dispatcher thread.
+    """
+
+    def __init__(self, max_batch_size: int = 4, batch_wait: float = 0.005,
+                 startup_timeout: float = 600.0, response_timeout: float = 120.0):
+        self.max_batch_size = max_batch_size
+        self.batch_wait = batch_wait  # Seconds to wait for more requests to join a batch
+        self.response_timeout = response_timeout  # Seconds a batch may take before the worker counts as hung
+        self.broken = None  # Why the worker process stopped being usable, once it has
+
+        ctx = mp.get_context("spawn")  # Never fork a process that is running Playwright threads
+        self.request_queue = ctx.Queue()
+        self.response_queue = ctx.Queue()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(self.request_queue, self.response_queue),
+            daemon=True
+        )
+        # Shared memory blocks, one per batch slot; only the dispatcher thread touches them
+        self.shm_blocks: List[shared_memory.SharedMemory] = []
+
+        self.process.start()
+        try:
+            ready = self._get_response(startup_timeout)
+        except RuntimeError:
+            self.process.terminate()
+            raise
+        if "error" in ready:
+            raise RuntimeError(f"OCR worker failed to start: {ready['error']}")
+
+        self.pending = queue.Queue()
+        self.dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self.dispatcher.start()
+
+    def healthy(self) -> bool:
+        """Whether the worker process is still alive and answering."""
+        return self.broken is None and self.process.is_alive()
+
+    def predict(self, image: np.ndarray) -> Dict[str, Any]:
+        """Run OCR on an HxWx3 BGR uint8 image and return texts, boxes and scores."""
+        if self.broken is not None:
+            raise RuntimeError(self.broken)
+        future = Future()
+        self.pending.put((image, future))
+        return future.result()
+
+    def _dispatch(self) -> None:
+        """Drain pending requests into batches and send them to the worker process."""
+        while True:
+            item = self.pending.get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.batch_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.pending.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self.pending.put(None)  # Stop after this batch
+                    break
+                batch.append(item)
+
+            self._run_batch(batch)
+
+    def _shm_slot(self, slot: int, size: int) -> shared_memory.SharedMemory:
+        """Return the shared block for a batch slot, growing it only for larger frames."""
+        if slot == len(self.shm_blocks):
+            self.shm_blocks.append(shared_memory.SharedMemory(create=True, size=size))
+        elif self.shm_blocks[slot].size < size:
+            self.shm_blocks[slot].close()
+            self.shm_blocks[slot].unlink()
+            self.shm_blocks[slot] = shared_memory.SharedMemory(create=True, size=size)
+        return self.shm_blocks[slot]
+
+    def _get_response(self, timeout: float):
+        """Wait for the worker's next response, failing if the process exits or stops answering."""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return self.response_queue.get(timeout=min(1.0, max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                pass
+            if not self.process.is_alive():
+                raise RuntimeError(f"OCR worker process exited with code {self.process.exitcode}")
+            if time.monotonic() >= deadline:
+                raise RuntimeError(f"OCR worker did not respond within {timeout:.0f}s")
+
+    def _run_batch(self, batch: List[Tuple[np.ndarray, Future]]) -> None:
+        if self.broken is not None:
+            responses = [{"error": self.broken}] * len(batch)
+        else:
+            try:
+                requests = []
+                for slot, (image, _) in enumerate(batch):
+                    shm = self._shm_slot(slot, image.nbytes)
+                    buffer = np.ndarray(image.shape, dtype=image.dtype, buffer=shm.buf)
+                    buffer[...] = image
+                    del buffer
+                    requests.append((shm.name, image.shape, image.dtype.str))
+
+                self.request_queue.put(requests)
+                responses = self._get_response(self.response_timeout)
+            except RuntimeError as e:
+                # A late answer would be taken for the next batch's, so retire this worker
+                self.broken = str(e)
+                if self.process.is_alive():
+                    self.process.terminate()
+                responses = [{"error": self.broken}] * len(batch)
+            except Exception as e:
+                responses = [{"error": str(e)}] * len(batch)
+
+        for (_, future), response in zip(batch, responses):
+            if "error" in response:
+                future.set_exception(RuntimeError(response["error"]))
+            else:
+                future.set_result(response)
+
+    def close(self) -> None:
+        """Stop the dispatcher and worker process and free the shared memory blocks."""
+        if self.dispatcher.is_alive():
+            self.pending.put(None)
+            self.dispatcher.join(timeout=10)
+        if self.process.is_alive():
+            self.request_queue.put(None)
+            self.process.join(timeout=10)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join(timeout=10)
+        for shm in self.shm_blocks:
+            shm.close()
+            shm.unlink()
+        self.shm_blocks = []
@@ -3,6 +3,7 @@ Progress tracking utility for trajectory generation pipeline.
 Tracks progress of each account and instruction execution in real-time.
 """
 
+import copy
 import json
 import os
 import time
@@ -11,14 +12,27 @@ from typing import Dict, Any, List, Optional
 from threading import Lock
 
 class ProgressTracker:
+    STEP_FLUSH_INTERVAL = 5.0  # Seconds between progress file writes triggered by step updates alone
+
     def __init__(self, results_dir: str):
         self.results_dir = results_dir
         self.progress_file = os.path.join(results_dir, "progress_tracking.json")
         self.lock = Lock()  # Thread-safe updates
+        # Progress is kept in memory; the file is a snapshot of it for monitoring
+        self.progress: Dict[str, Any] = {}
+        self.last_write = 0.0
         
         # Initialize progress tracking
         self.initialize_progress()
     
+    def _write_progress(self):
+        """Snapshot the in-memory progress to the progress file (caller holds the lock)."""
+        tmp_file = self.progress_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.progress, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, self.progress_file)
+        self.last_write = time.monotonic()
+    
     def initialize_progress(self):
         """Initialize the progress tracking file."""
         pipeline_run_id = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
@@ -39,15 +53,13 @@ class ProgressTracker:
         }
         
         with self.lock:
-            with open(self.progress_file, 'w', encoding='utf-8') as f:
-                json.dump(initial_progress, f, indent=2, ensure_ascii=False)
+            self.progress = initial_progress
+            self._write_progress()
     
     def setup_accounts(self, accounts: List[Dict], total_instructions: int):
         """Setup account tracking structure."""
         with self.lock:
-            # Read current progress
-            with open(self.progress_file, 'r', encoding='utf-8') as f:
-                progress = json.load(f)
+            progress = self.progress
             
             # Update total instructions
             progress["total_instructions"] = total_instructions
@@ -78,14 +90,12 @@ class ProgressTracker:
             progress["last_updated"] = datetime.now().isoformat() + "Z"
             
             # Write back
-            with open(self.progress_file, 'w', encoding='utf-8') as f:
-                json.dump(progress, f, indent=2, ensure_ascii=False)
+            self._write_progress()
     
     def start_instruction(self, account_email: str, instruction_index: int, augmented_instruction: str, episode_name: str):
         """Mark an instruction as in progress."""
         with self.lock:
-            with open(self.progress_file, 'r', encoding='utf-8') as f:
-                progress = json.load(f)
+            progress = self.progress
             
             if account_email in progress["accounts"]:
                 progress["accounts"][account_email]["in_progress_instruction"] = {
@@ -106,15 +116,13 @@ class ProgressTracker:
                 
                 progress["last_updated"] = datetime.now().isoformat() + "Z"
                 
-                with open(self.progress_file, 'w', encoding='utf-8') as f:
-                    json.dump(progress, f, indent=2, ensure_ascii=False)
+                self._write_progress()
     
     def complete_instruction(self, account_email: str, instruction_index: int, augmented_instruction: str, 
                            episode_name: str, success: bool = True, error_message: str = None):
         """Mark an instruction as completed or failed."""
         with self.lock:
-            with open(self.progress_file, 'r', encoding='utf-8') as f:
-                progress = json.load(f)
+            progress = self.progress
             
             if account_email in progress["accounts"]:
                 account = progress["accounts"][account_email]
@@ -158,14 +166,15 @@ class ProgressTracker:
                 
                 progress["last_updated"] = datetime.now().isoformat() + "Z"
                 
-                with open(self.progress_file, 'w', encoding='utf-8') as f:
-                    json.dump(progress, f, indent=2, ensure_ascii=False)
+                self._write_progress()
     
     def update_step(self, account_email: str, current_step: int):
-        """Update the current step for an in-progress instruction."""
+        """
+        Update the current step for an in-progress instruction.
+        Steps are frequent, so the file is rewritten at most every STEP_FLUSH_INTERVAL seconds.
+        """
         with self.lock:
-            with open(self.progress_file, 'r', encoding='utf-8') as f:
-                progress = json.load(f)
+            progress = self.progress
             
             if (account_email in progress["accounts"] and 
                 progress["accounts"][account_email]["in_progress_instruction"]):
@@ -173,14 +182,13 @@ class ProgressTracker:
                 progress["accounts"][account_email]["in_progress_instruction"]["current_step"] = current_step
                 progress["last_updated"] = datetime.now().isoformat() + "Z"
                 
-                with open(self.progress_file, 'w', encoding='utf-8') as f:
-                    json.dump(progress, f, indent=2, ensure_ascii=False)
+                if time.monotonic() - self.last_write >= self.STEP_FLUSH_INTERVAL:
+                    self._write_progress()
     
     def get_progress_summary(self) -> Dict[str, Any]:
         """Get a summary of current progress."""
         with self.lock:
-            with open(self.progress_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return copy.deepcopy(self.progress)
     
     def print_progress_summary(self):
         """Print a formatted progress summary."""
@@ -3,9 +3,11 @@ import os
 import html
 import time
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 from urllib.parse import urlparse
 
+@lru_cache(maxsize=1024)  # Instructions for a persona share the same URL
 def get_site_name_from_url(url: str) -> str:
     """Extract a meaningful site name from URL for folder naming."""
     try:
@@ -71,6 +73,14 @@ def create_episode_directory(base_dir: str, eps_name: str) -> Dict[str, str]:
     return dirs
 
 
+def atomic_write_bytes(path: str, data: bytes) -> None:
+    """Write bytes to a temp file and swap it into place so readers never see a partial file."""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
 def create_trajectory_file(dirs: Dict[str, str]) -> None:
     """Create an empty trajectory.json file with initial structure."""
     trajectory_path = os.path.join(dirs['root'], 'trajectory.json')
@@ -810,14 +820,25 @@ def create_metadata(persona: str, url: str, orig_instruction: str, aug_instructi
     }
 
 
-def write_user_message(user_message_file: str, goal: str, execution_history: list, page, tree, failed_codes: list = None):
-    """Write a user message file with goal, previous actions, current page, ax tree, and error codes."""
+def format_previous_action(index: int, step: str, code: str) -> str:
+    """Format one executed step as a line of the user message's Previous Actions section."""
+    return f"  {index}. {step} | Code: {code}"
+
+
+def write_user_message(user_message_file: str, goal: str, execution_history: list, page, tree, failed_codes: list = None, previous_actions: Optional[str] = None):
+    """
+    Write a user message file with goal, previous actions, current page, ax tree, and error codes.
+    Callers that keep the Previous Actions lines pre-rendered pass them as previous_actions,
+    so the history is not re-formatted on every step.
+    """
     user_message_content = []
     user_message_content.append(f"Goal: {goal}\n")
     user_message_content.append("Previous Actions:")
-    if execution_history:
+    if previous_actions:
+        user_message_content.append(previous_actions)
+    elif execution_history:
         for i, act in enumerate(execution_history, 1):
-            user_message_content.append(f"  {i}. {act['step']} | Code: {act['code']}")
+            user_message_content.append(format_previous_action(i, act['step'], act['code']))
     else:
         user_message_content.append("  None")
     user_message_content.append("")
@@ -1012,10 +1033,13 @@ def generate_trajectory_html(dirs: Dict[str, str], metadata: Dict[str, Any]) ->
         # Get the last step number to find the final screenshot
         last_step_num = max(int(step_num) for step_num in trajectory.keys())
         final_screenshot_path = os.path.join('images', f'screenshot_{last_step_num:03d}.png')
-        final_annotated_path = os.path.join('annotated_images', f'annotated_screenshot_{last_step_num:03d}.png')
-        
-        # Check if final annotated screenshot exists
-        final_annotated_exists = os.path.exists(os.path.join(dirs['root'], final_annotated_path))
+        # Check if final annotated screenshot exists (OCR runs save it as JPEG)
+        final_annotated_path = next(
+            (path for path in (os.path.join('annotated_images', f'annotated_screenshot_{last_step_num:03d}.{ext}') for ext in ('png', 'jpg'))
+             if os.path.exists(os.path.join(dirs['root'], path))),
+            None
+        )
+        final_annotated_exists = final_annotated_path is not None
         
         html_content += f"""
         <h2>Final Result</h2>